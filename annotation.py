@@ -0,0 +1,39 @@
+import os
+
+import cv2
+
+TARGET_LABEL = "Juliana"
+SNAPSHOT_INTERVAL = 3  # seconds between snapshot rounds
+
+
+def label_color(label):
+    return (0, 255, 0) if label == TARGET_LABEL else (0, 0, 255)
+
+
+def draw_detections(frame, detections):
+    """Draw a box and name for every detection directly onto `frame`."""
+    for (x, y, w, h, label, score) in detections:
+        color = label_color(label)
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(frame, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+
+
+def stamp_snapshot(frame, labels, timestamp, coords):
+    """Write the label(s), time and location into the top-left corner of `frame`."""
+    color = label_color(TARGET_LABEL if TARGET_LABEL in labels else labels[0])
+    stamp = timestamp.strftime("%Y-%m-%d_%H-%M-%S")
+    names = ", ".join(dict.fromkeys(labels))
+    cv2.putText(frame, f"{names} @ {stamp}", (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    cv2.putText(frame, f"Location: [{coords[0]}, {coords[1]}]", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+
+
+def snapshot_path(folder, label, timestamp):
+    return os.path.join(folder, f"{label}_{timestamp.strftime('%Y-%m-%d_%H-%M-%S')}.jpg")
+
+
+def snapshot_targets(detections, known_folder, unknown_folder):
+    """(label, folder) for every detection, with the target going to the known folder."""
+    return [
+        (label, known_folder if label == TARGET_LABEL else unknown_folder)
+        for (_, _, _, _, label, _) in detections
+    ]
@@ -0,0 +1,89 @@
+import json
+import os
+
+from face_detector import DEFAULT_DOWNSCALE, DEFAULT_MIN_FACE, DEFAULT_ROI_MARGIN
+from face_gallery import MATCH_THRESHOLD
+from location_service import DEFAULT_TTL
+from snapshot_writer import DEFAULT_JPEG_QUALITY, DEFAULT_QUEUE_SIZE
+from snapshot_dedup import DEFAULT_DEDUP_THRESHOLD, DEFAULT_DEDUP_RECENT
+from stage_metrics import DEFAULT_METRICS_FILE, DEFAULT_METRICS_INTERVAL
+from identity_cache import DEFAULT_REFRESH, DEFAULT_UNCERTAIN_MARGIN
+from route_tools import DEFAULT_SIMPLIFY_TOLERANCE, DEFAULT_COVERAGE_SPACING
+from flight_sim import (DEFAULT_CRUISE_SPEED, DEFAULT_ACCELERATION, DEFAULT_TURN_RATE,
+                        DEFAULT_PIXELS_PER_METRE, DEFAULT_PLAYBACK_SPEED)
+from clip_recorder import DEFAULT_PRE_ROLL, DEFAULT_POST_ROLL, DEFAULT_MAX_CLIP, DEFAULT_BUFFER_MB
+
+SETTINGS_FILE = "gui_settings.json"
+
+DEFAULT_SETTINGS = {
+    "theme": "day",
+    # run the cascade every N frames and track boxes with optical flow in between
+    "tracking_enabled": True,
+    "detect_every_n": 5,
+    "redetect_confidence": 0.5,
+    "match_threshold": MATCH_THRESHOLD,
+    # keep each face track's label and only re-run the gallery lookup for new
+    # tracks, every identity_refresh seconds, or when the score is borderline
+    "identity_cache_enabled": True,
+    "identity_refresh": DEFAULT_REFRESH,
+    "identity_uncertain_margin": DEFAULT_UNCERTAIN_MARGIN,
+    # "full" = cascade over the whole frame, "multires" = coarse pass + full-res ROIs
+    "detection_mode": "full",
+    "detect_downscale": DEFAULT_DOWNSCALE,
+    "detect_min_face": DEFAULT_MIN_FACE,
+    "detect_roi_margin": DEFAULT_ROI_MARGIN,
+    # device indices and/or video files; more than one runs a worker process per stream
+    "camera_sources": [0],
+    # snapshots are encoded on a background thread; full queue = snapshot dropped
+    "snapshot_jpeg_quality": DEFAULT_JPEG_QUALITY,
+    "snapshot_queue_size": DEFAULT_QUEUE_SIZE,
+    # skip near-identical face snapshots (dHash within threshold bits of one of the last
+    # snapshot_dedup_recent snapshots of that label); events reuse the earlier file
+    "snapshot_dedup_enabled": True,
+    "snapshot_dedup_threshold": DEFAULT_DEDUP_THRESHOLD,
+    "snapshot_dedup_recent": DEFAULT_DEDUP_RECENT,
+    # "ip" (geocoder lookup), "fixed" (location_fixed) or "nmea" (replay location_nmea_file)
+    "location_backend": "ip",
+    "location_fixed": None,
+    "location_nmea_file": "",
+    "location_ttl": DEFAULT_TTL,
+    # per-stage timings; off = no-op timers. Export to a JSON file and/or
+    # a Prometheus /metrics endpoint on localhost (metrics_port: null = off)
+    "metrics_enabled": False,
+    "metrics_overlay": False,
+    "metrics_file": DEFAULT_METRICS_FILE,
+    "metrics_interval": DEFAULT_METRICS_INTERVAL,
+    "metrics_port": None,
+    # MP4 clips around known-face detections, cut from a compressed pre-roll
+    # ring; clip_buffer_mb caps the ring plus the clip being collected (opt-in, uses disk)
+    "clips_enabled": False,
+    "clip_pre_roll": DEFAULT_PRE_ROLL,
+    "clip_post_roll": DEFAULT_POST_ROLL,
+    "clip_max_length": DEFAULT_MAX_CLIP,
+    "clip_buffer_mb": DEFAULT_BUFFER_MB,
+    # Douglas-Peucker tolerance for the route planner's Simplify button
+    "route_simplify_tolerance": DEFAULT_SIMPLIFY_TOLERANCE,
+    # lawnmower sweep over a drawn area: track spacing in px, angle in degrees (null = auto)
+    "coverage_spacing": DEFAULT_COVERAGE_SPACING,
+    "coverage_angle": None,
+    # route simulator kinematics (m/s, m/s^2, deg/s, canvas px per metre) and fast-forward factor
+    "sim_cruise_speed": DEFAULT_CRUISE_SPEED,
+    "sim_acceleration": DEFAULT_ACCELERATION,
+    "sim_turn_rate": DEFAULT_TURN_RATE,
+    "sim_pixels_per_metre": DEFAULT_PIXELS_PER_METRE,
+    "sim_playback_speed": DEFAULT_PLAYBACK_SPEED,
+}
+
+
+def load_settings(path=SETTINGS_FILE):
+    """Defaults overlaid with whatever gui_settings.json sets."""
+    settings = dict(DEFAULT_SETTINGS)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            settings.update(json.load(f))
+    return settings
+
+
+def save_settings(settings, path=SETTINGS_FILE):
+    with open(path, "w") as f:
+        json.dump(settings, f, indent=2)
@@ -0,0 +1,299 @@
+"""
+Headless replay benchmark for the recognition pipeline.
+
+Feeds a video file, an image folder or a synthetic clip built from the
+known_faces images through the same flip -> gray -> detect/track ->
+annotate -> snapshot path the live app uses, and reports throughput,
+per-frame latency percentiles, peak RSS and detection counts as JSON.
+
+    python benchmark.py --video flight.mp4 --out bench/flight.json
+    python benchmark.py --images frames/ --set detection_mode="multires"
+    python benchmark.py --synthetic 600
+    python benchmark.py --images known_faces --compare-legacy   # agreement with the original matcher
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+
+from annotation import SNAPSHOT_INTERVAL, draw_detections, snapshot_targets
+from app_settings import load_settings
+from face_cache import IMAGE_EXTENSIONS, KnownFaceCache
+from face_detector import make_detector
+from face_gallery import FaceGallery, recognize_faces_batch, recognize_or_track
+from face_tracker import FaceTracker
+from identity_cache import make_identity_cache
+from location_service import UNKNOWN_LOCATION
+from snapshot_writer import SnapshotWriter
+from snapshot_dedup import make_snapshot_deduper
+
+FRAME_SIZE = (640, 480)
+
+
+def video_frames(path):
+    cap = cv2.VideoCapture(path)
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                return
+            yield frame
+    finally:
+        cap.release()
+
+
+def image_frames(folder):
+    for name in sorted(os.listdir(folder)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            frame = cv2.imread(os.path.join(folder, name))
+            if frame is not None:
+                yield frame
+
+
+def synthetic_frames(known_dir, count, size=FRAME_SIZE, seed=0):
+    """
+    A deterministic clip with the enrollment photos drifting over a noisy
+    background, switching face every two seconds, so the benchmark runs on
+    machines without a camera or sample footage.
+    """
+    faces = [img for img in image_frames(known_dir)] if os.path.isdir(known_dir) else []
+    if not faces:
+        raise SystemExit(f"--synthetic needs at least one image in {known_dir}/")
+
+    width, height = size
+    rng = np.random.default_rng(seed)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (9, 9), 0)
+    tiles = []
+    for img in faces:
+        scale = (height * 0.45) / img.shape[0]
+        tiles.append(cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)[:height, :width])
+
+    for i in range(count):
+        tile = tiles[(i // 60) % len(tiles)]
+        th, tw = tile.shape[:2]
+        x = int((width - tw) / 2 * (1 + 0.8 * np.sin(i / 45)))
+        y = int((height - th) / 2 * (1 + 0.5 * np.cos(i / 60)))
+        frame = background.copy()
+        frame[y:y + th, x:x + tw] = tile
+        yield frame
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(frames, settings, known_dir="known_faces", snapshot_dir=None, fps=30.0, flip=True):
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    gallery = FaceGallery(KnownFaceCache(known_dir, face_cascade).load())
+    detector = make_detector(face_cascade, settings)
+    identities = make_identity_cache(settings)
+    tracker = None
+    if settings["tracking_enabled"]:
+        tracker = FaceTracker(settings["detect_every_n"], settings["redetect_confidence"])
+
+    known_folder = os.path.join(snapshot_dir, "known")
+    unknown_folder = os.path.join(snapshot_dir, "unknown")
+    os.makedirs(known_folder, exist_ok=True)
+    os.makedirs(unknown_folder, exist_ok=True)
+    writer = SnapshotWriter(settings["snapshot_jpeg_quality"], settings["snapshot_queue_size"],
+                            dedup=make_snapshot_deduper(settings))
+
+    # snapshot cadence follows the clip's own timeline, not wall time
+    clip_start = datetime(2000, 1, 1)
+    last_snapshot = None
+    latencies = []
+    counts = Counter()
+    frames_with_faces = 0
+
+    started = time.perf_counter()
+    for i, frame in enumerate(frames):
+        t0 = time.perf_counter()
+        if flip:
+            frame = cv2.flip(frame, 1)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        detections, _ = recognize_or_track(
+            gray, face_cascade, gallery, tracker, settings["match_threshold"], detector, identities
+        )
+        draw_detections(frame, detections)
+
+        now = clip_start + timedelta(seconds=i / fps)
+        if last_snapshot is None or (now - last_snapshot).total_seconds() >= SNAPSHOT_INTERVAL:
+            writer.submit(frame, snapshot_targets(detections, known_folder, unknown_folder), now, UNKNOWN_LOCATION,
+                          [d[:4] for d in detections])
+            last_snapshot = now
+
+        latencies.append(time.perf_counter() - t0)
+        counts.update(d[4] for d in detections)
+        frames_with_faces += bool(detections)
+    elapsed = time.perf_counter() - started
+    writer.close()
+
+    lat_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "frames": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(float(lat_ms.mean()), 3),
+            "p50": round(float(np.percentile(lat_ms, 50)), 3),
+            "p90": round(float(np.percentile(lat_ms, 90)), 3),
+            "p99": round(float(np.percentile(lat_ms, 99)), 3),
+            "max": round(float(lat_ms.max()), 3),
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "detections": {
+            "total": sum(counts.values()),
+            "frames_with_faces": frames_with_faces,
+            "by_label": dict(counts.most_common()),
+        },
+        "snapshots": writer.stats(),
+        "recognition": identities.stats() if identities else None,
+        "gallery_size": len(gallery),
+    }
+
+
+def compare_with_legacy(frames, settings, known_dir="known_faces", flip=True):
+    """
+    Accept/reject agreement between the gallery matcher and the original
+    recognize_juliana_2_6_25.recognize_faces_in_frame on the same frames.
+    Both do a full cascade pass (no tracking, no identity cache); a frame
+    agrees when both produce the same multiset of labels.
+    """
+    try:
+        from recognize_juliana_2_6_25 import load_known_faces, recognize_faces_in_frame
+    except ImportError as e:
+        raise SystemExit(f"--compare-legacy needs the original recognizer module: {e}")
+
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    gallery = FaceGallery(KnownFaceCache(known_dir, face_cascade).load())
+    legacy_faces = load_known_faces(known_dir, face_cascade)
+    total = agreed = 0
+    legacy_labels, gallery_only, legacy_only = Counter(), Counter(), Counter()
+    for frame in frames:
+        if flip:
+            frame = cv2.flip(frame, 1)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        ours, _ = recognize_faces_batch(gray, face_cascade, gallery, settings["match_threshold"])
+        theirs, _ = recognize_faces_in_frame(frame.copy(), gray, face_cascade, legacy_faces)
+        ours, theirs = Counter(d[4] for d in ours), Counter(d[4] for d in theirs)
+        total += 1
+        agreed += ours == theirs
+        legacy_labels.update(theirs)
+        gallery_only.update(ours - theirs)
+        legacy_only.update(theirs - ours)
+    return {
+        "frames": total,
+        "agreement": round(agreed / total, 4) if total else None,
+        "legacy_labels": dict(legacy_labels.most_common()),
+        "gallery_only": dict(gallery_only.most_common()),
+        "legacy_only": dict(legacy_only.most_common()),
+    }
+
+
+def parse_overrides(pairs):
+    overrides = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        try:
+            overrides[key] = json.loads(value)
+        except json.JSONDecodeError:
+            overrides[key] = value
+    return overrides
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay footage through the recognition pipeline without a camera or GUI.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--video", help="video file to replay")
+    source.add_argument("--images", help="folder of frames to replay in name order")
+    source.add_argument("--synthetic", type=int, metavar="FRAMES",
+                        help="generate a clip of this many frames from the known_faces images")
+    parser.add_argument("--known-faces", default="known_faces", help="enrollment folder (default: known_faces)")
+    parser.add_argument("--settings", default=None, help="settings file (default: gui_settings.json)")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a setting, value parsed as JSON (repeatable)")
+    parser.add_argument("--fps", type=float, default=30.0, help="clip frame rate used for snapshot timing")
+    parser.add_argument("--no-flip", action="store_true", help="skip the mirror flip applied to webcam input")
+    parser.add_argument("--snapshot-dir", default=None, help="keep snapshots here instead of a temp folder")
+    parser.add_argument("--out", default=None, help="write results JSON to this file")
+    parser.add_argument("--compare-legacy", action="store_true",
+                        help="instead of timing, compare labels with recognize_juliana_2_6_25's matcher")
+    args = parser.parse_args(argv)
+
+    settings = load_settings(args.settings) if args.settings else load_settings()
+    settings.update(parse_overrides(args.set))
+
+    if args.video:
+        frames, source_desc = video_frames(args.video), {"video": args.video}
+    elif args.images:
+        frames, source_desc = image_frames(args.images), {"images": args.images}
+    else:
+        frames, source_desc = synthetic_frames(args.known_faces, args.synthetic), {"synthetic": args.synthetic}
+
+    if args.compare_legacy:
+        results = compare_with_legacy(frames, settings, args.known_faces, flip=not args.no_flip)
+    else:
+        snapshot_dir = args.snapshot_dir or tempfile.mkdtemp(prefix="bench_snapshots_")
+        try:
+            results = run_benchmark(frames, settings, args.known_faces, snapshot_dir,
+                                    fps=args.fps, flip=not args.no_flip)
+        finally:
+            if not args.snapshot_dir:
+                shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "platform": platform.platform(),
+        "opencv": cv2.__version__,
+        "source": source_desc,
+        "settings": {k: settings[k] for k in (
+            "tracking_enabled", "detect_every_n", "redetect_confidence", "match_threshold",
+            "identity_cache_enabled", "identity_refresh", "identity_uncertain_margin",
+            "detection_mode", "detect_downscale", "detect_min_face", "detect_roi_margin",
+            "snapshot_jpeg_quality", "snapshot_queue_size", "snapshot_dedup_enabled", "snapshot_dedup_threshold",
+        )},
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            f.write(text)
+    print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import os
+import queue
+import threading
+from collections import deque
+from datetime import timedelta
+
+import cv2
+import numpy as np
+
+DEFAULT_PRE_ROLL = 5.0        # seconds kept before a trigger
+DEFAULT_POST_ROLL = 5.0       # seconds recorded after the last trigger
+DEFAULT_MAX_CLIP = 60.0       # a clip is cut here even if the target stays in view
+DEFAULT_BUFFER_MB = 48        # memory budget for the compressed ring
+DEFAULT_CLIP_JPEG_QUALITY = 80
+CLIP_DIR = "clips"
+
+
+def clip_path(folder, label, timestamp):
+    """First free clip path for `label` at `timestamp`; clips starting in the same second get _1, _2, ..."""
+    base = os.path.join(folder, f"{label}_{timestamp.strftime('%Y-%m-%d_%H-%M-%S')}")
+    path, n = base + ".mp4", 1
+    while os.path.exists(path):
+        path = f"{base}_{n}.mp4"
+        n += 1
+    return path
+
+
+class FrameRing:
+    """
+    Recent frames as JPEG bytes, oldest first. Bounded both by age
+    (`seconds`) and by total size (`max_bytes`), whichever bites first.
+    """
+
+    def __init__(self, seconds, max_bytes):
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.frames = deque()  # (timestamp, jpeg bytes)
+        self.nbytes = 0
+
+    def append(self, timestamp, jpeg):
+        self.frames.append((timestamp, jpeg))
+        self.nbytes += len(jpeg)
+        while self.frames and (self.nbytes > self.max_bytes or
+                               (timestamp - self.frames[0][0]).total_seconds() > self.seconds):
+            self.nbytes -= len(self.frames.popleft()[1])
+
+    def since(self, start):
+        return [(t, jpeg) for t, jpeg in self.frames if t >= start]
+
+
+class ClipRecorder:
+    """
+    Pre-roll buffer plus event-triggered clip writer for one session.
+
+    push() only hands the frame reference to a compressor thread (dropping
+    it if that thread is behind), so the capture path never waits on JPEG or
+    video encoding. trigger(label, timestamp) opens a clip that starts
+    `pre_roll` seconds before the detection; further triggers keep it open
+    until `post_roll` seconds after the last one, or `max_clip` in total.
+    Finished clips are encoded to MP4 on a separate writer thread.
+
+    Memory is bounded by `buffer_mb`: half for the pre-roll ring, half for
+    the clip being collected (a clip that outgrows it is cut early).
+
+    Frames passed to push() must not be modified afterwards.
+    """
+
+    def __init__(self, folder, pre_roll=DEFAULT_PRE_ROLL, post_roll=DEFAULT_POST_ROLL,
+                 max_clip=DEFAULT_MAX_CLIP, buffer_mb=DEFAULT_BUFFER_MB,
+                 jpeg_quality=DEFAULT_CLIP_JPEG_QUALITY):
+        self.folder = folder
+        self.pre_roll = timedelta(seconds=float(pre_roll))
+        self.post_roll = timedelta(seconds=float(post_roll))
+        self.max_clip = timedelta(seconds=float(max_clip))
+        self.jpeg_quality = int(jpeg_quality)
+        # the ring and the clip being collected share one budget
+        self.max_bytes = int(buffer_mb * 1024 * 1024)
+        self.ring = FrameRing(float(pre_roll), self.max_bytes // 2)
+
+        self._lock = threading.Lock()
+        self._incoming = queue.Queue(maxsize=2)
+        self._clips = queue.Queue()
+        self._pending_triggers = []
+        self._active = None  # {"label", "start", "end", "limit", "frames", "last", "nbytes"}
+        self.dropped_frames = 0
+        self.clips_written = 0
+        self.clips_failed = 0
+
+        self._compressor = threading.Thread(target=self._compress_loop, name="clip-ring", daemon=True)
+        self._writer = threading.Thread(target=self._write_loop, name="clip-writer", daemon=True)
+        self._compressor.start()
+        self._writer.start()
+
+    def push(self, frame, timestamp):
+        try:
+            self._incoming.put_nowait((frame, timestamp))
+        except queue.Full:
+            with self._lock:
+                self.dropped_frames += 1
+
+    def trigger(self, label, timestamp):
+        with self._lock:
+            self._pending_triggers.append((label, timestamp))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "clips": self.clips_written,
+                "failed": self.clips_failed,
+                "dropped_frames": self.dropped_frames,
+                "buffer_bytes": self.ring.nbytes,
+            }
+
+    def close(self, timeout=30.0):
+        """Finish the open clip with what has been captured, write everything queued and stop."""
+        self._incoming.put((None, None))
+        self._compressor.join(timeout)
+        self._writer.join(timeout)
+
+    def _compress_loop(self):
+        while True:
+            frame, timestamp = self._incoming.get()
+            if frame is None:
+                self._apply_triggers()
+                self._finish_clip()
+                self._clips.put(None)
+                return
+            ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                continue
+            data = jpeg.tobytes()
+            self.ring.append(timestamp, data)
+
+            self._apply_triggers()
+            clip = self._active
+            if clip is None:
+                continue
+            if timestamp > clip["end"]:
+                self._finish_clip()
+                continue
+            if timestamp > clip["last"]:
+                clip["frames"].append((timestamp, data))
+                clip["last"] = timestamp
+                clip["nbytes"] += len(data)
+                if clip["nbytes"] > self.max_bytes // 2:
+                    self._finish_clip()
+
+    def _apply_triggers(self):
+        with self._lock:
+            triggers, self._pending_triggers = self._pending_triggers, []
+        for label, timestamp in triggers:
+            clip = self._active
+            if clip is None:
+                frames = self.ring.since(timestamp - self.pre_roll)
+                self._active = {
+                    "label": label,
+                    "start": timestamp,
+                    "end": timestamp + self.post_roll,
+                    "limit": timestamp + self.max_clip,
+                    "frames": frames,
+                    "last": frames[-1][0] if frames else timestamp,
+                    "nbytes": sum(len(jpeg) for _, jpeg in frames),
+                }
+            else:
+                clip["end"] = min(max(clip["end"], timestamp + self.post_roll), clip["limit"])
+
+    def _finish_clip(self):
+        clip, self._active = self._active, None
+        if clip and clip["frames"]:
+            self._clips.put(clip)
+
+    def _write_loop(self):
+        while True:
+            clip = self._clips.get()
+            if clip is None:
+                return
+            try:
+                self._encode(clip)
+            except Exception as e:
+                print(f"Clip write failed: {e}")
+                with self._lock:
+                    self.clips_failed += 1
+                continue
+            with self._lock:
+                self.clips_written += 1
+
+    def _encode(self, clip):
+        frames = clip["frames"]
+        span = (frames[-1][0] - frames[0][0]).total_seconds()
+        fps = (len(frames) - 1) / span if len(frames) > 1 and span > 0 else 1.0
+        first = cv2.imdecode(np.frombuffer(frames[0][1], np.uint8), cv2.IMREAD_COLOR)
+        height, width = first.shape[:2]
+
+        os.makedirs(self.folder, exist_ok=True)
+        path = clip_path(self.folder, clip["label"], clip["start"])
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+        if not writer.isOpened():
+            raise RuntimeError(f"cannot open video writer for {path}")
+        try:
+            writer.write(first)
+            for _, jpeg in frames[1:]:
+                frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+                if frame.shape[:2] != (height, width):
+                    frame = cv2.resize(frame, (width, height))
+                writer.write(frame)
+        finally:
+            writer.release()
+
+
+def make_clip_recorder(folder, settings):
+    """ClipRecorder for `folder` when clips_enabled, else None."""
+    if not settings.get("clips_enabled"):
+        return None
+    return ClipRecorder(
+        folder,
+        pre_roll=settings.get("clip_pre_roll", DEFAULT_PRE_ROLL),
+        post_roll=settings.get("clip_post_roll", DEFAULT_POST_ROLL),
+        max_clip=settings.get("clip_max_length", DEFAULT_MAX_CLIP),
+        buffer_mb=settings.get("clip_buffer_mb", DEFAULT_BUFFER_MB),
+    )
@@ -1,32 +1,39 @@
-import cv2
+import json
+import math
 import os
-import shutil
-import zipfile
 import tkinter as tk
-from tkinter import Label, Button, Toplevel, Text, Scrollbar, END, Frame, Canvas, filedialog, simpledialog, messagebox
+from tkinter import Label, Button, Toplevel, Text, Scrollbar, END, Frame, Canvas, Entry, filedialog, simpledialog, messagebox
 from PIL import Image, ImageTk
-from datetime import datetime
-import geocoder
+from datetime import datetime, timedelta
 import threading
-import urllib.request
+import time
 from io import BytesIO
-import json
 import winsound
-import time
 
-from recognize_juliana_2_6_25 import (
-    setup_folders,
-    load_known_faces,
-    recognize_faces_in_frame
-)
-from route_planner import launch_route_planner
+from route_planner import launch_route_planner, ROUTE_FILE
+from route_tools import simplify_route, optimize_route, coverage_path, path_length
+from drone_sprites import DroneSprites
+from flight_sim import make_flight_profile, format_duration
+from surveillance_engine import SurveillanceEngine
+from map_cache import MapImageCache
+from thumbnails import THUMB_SIZE, list_snapshots, load_thumbnail
+from event_store import summary_lines
+from session_export import SessionExporter, ExportCancelled
+from app_settings import load_settings, save_settings
+
+GALLERY_COLUMNS = 4
+GALLERY_PAGE_SIZE = 12
+SESSIONS_PAGE_SIZE = 20
 
-SETTINGS_FILE = "gui_settings.json"
+# live view repaint bounds (ms); in between it follows the capture rate
+RENDER_MIN_MS = 15
+RENDER_MAX_MS = 100
+RENDER_IDLE_MS = 200
 
+SIM_FRAME_MS = 16  # route simulator repaint interval; positions come from the trajectory clock
 
 class FaceRecognitionApp:
     def __init__(self, root):
-        self.last_engagement_time = {}
         self.engagement_active = False 
         self.root = root
         self.root.title("Juliana Face Recognition")
@@ -44,7 +51,7 @@ class FaceRecognitionApp:
 
         self.canvas.pack(side="left", fill="both", expand=True)
 
-          self.scrollable_frame.bind(
+        self.scrollable_frame.bind(
             "<Configure>",
             lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
         )
@@ -149,20 +156,14 @@ class FaceRecognitionApp:
         # hidden until a target is acquired
         self.engage_bar.place_forget()
 
-        self.cap = None
-        self.running = False
-        setup_folders()
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-        self.known_faces = load_known_faces("known_faces", self.face_cascade)
-        os.makedirs("session_logs", exist_ok=True)
-        os.makedirs("session_snapshots", exist_ok=True)
-
-        self.session_data = {}
-        self.last_snapshot_time = datetime.min
-        self.snapshot_folder_known = ""
-        self.snapshot_folder_unknown = ""
-        self.frame_lock = threading.Lock()
-        self.latest_frame = None
+        # capture, recognition and session logging live in the engine; the
+        # window only starts/stops sessions and shows what it produces
+        self.engine = SurveillanceEngine(on_target=self.on_target, on_finished=self.on_source_finished)
+        self.event_store = self.engine.event_store
+        self.map_cache = MapImageCache()
+        self._video_photo = None
+        self._drawn_seq = None
+        self._drone_sprites = None
 
         self.register_theme_widgets()
         self.apply_theme()
@@ -185,16 +186,16 @@ class FaceRecognitionApp:
         except:
             return None
 
+    def load_settings(self):
+        return load_settings()
+
     def load_theme(self):
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, "r") as f:
-                settings = json.load(f)
-            return settings.get("theme", "day")
-        return "day"
+        return self.load_settings().get("theme", "day")
 
     def save_theme(self, theme):
-        with open(SETTINGS_FILE, "w") as f:
-            json.dump({"theme": theme}, f)
+        settings = self.load_settings()
+        settings["theme"] = theme
+        save_settings(settings)
 
     def register_theme_widgets(self):
         self.widget_references = [
@@ -329,12 +330,17 @@ class FaceRecognitionApp:
             command=lambda: set_theme("night")
         ).pack(pady=4)
 
+    @property
+    def running(self):
+        return self.engine.running
+
+    @property
+    def session_data(self):
+        return self.engine.session_data
+
     def toggle_camera(self):
         if not self.running:
-            self.cap = cv2.VideoCapture(0)
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            self.running = True
+            self.engine.start_session(self.load_settings())
             self.status.config(text="Status: Running", fg="green")
             self.control_btn.config(text="Stop")
             self.summary_btn.grid_remove()
@@ -342,155 +348,55 @@ class FaceRecognitionApp:
             self.engagement_active = False
             self.target_label.config(text="")
             self.engage_bar.place_forget()
-
-            now = datetime.now()
-            timestamp = now.strftime('%Y-%m-%d_%H-%M-%S')
-            self.snapshot_folder_known = f"session_snapshots/{timestamp}/known"
-            self.snapshot_folder_unknown = f"session_snapshots/{timestamp}/unknown"
-            os.makedirs(self.snapshot_folder_known, exist_ok=True)
-            os.makedirs(self.snapshot_folder_unknown, exist_ok=True)
-
-            self.session_data = {
-                "start_time": now,
-                "end_time": None,
-                "total_faces": 0,
-                "juliana_faces": 0,
-                "unknown_faces": 0,
-                "detected_names": {},
-                "last_location": None,
-                "last_location_time": None,
-                "file_name": f"session_logs/session_{timestamp}.txt"
-            }
-
-            self.last_snapshot_time = datetime.min
-            threading.Thread(target=self.frame_capture_loop, daemon=True).start()
         else:
-            self.running = False
+            self.engine.stop_session()
             self.status.config(text="Status: Stopped", fg="red")
             self.control_btn.config(text="Start")
-            self.session_data["end_time"] = datetime.now()
             self.engagement_active = False
             self.engage_bar.place_forget()
 
-            if self.cap:
-                self.cap.release()
-                self.cap = None
             self.video_label.config(image='')
-
-            self.save_summary_to_file()
+            self._video_photo = None
+            self._drawn_seq = None
             self.summary_btn.grid()
             self.previous_btn.grid()
 
-    def frame_capture_loop(self):
-        while self.running and self.cap:
-            ret, frame = self.cap.read()
-            if not ret:
-                continue
-
-            frame = cv2.flip(frame, 1)
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            detections, unknown_count = recognize_faces_in_frame(
-                frame, gray, self.face_cascade, self.known_faces
-            )
-
-            now = datetime.now()
-            save_snapshot = (now - self.last_snapshot_time).total_seconds() >= 3
-            coords = ["Unknown", "Unknown"]
-            if save_snapshot:
-                location = geocoder.ip('me')
-                coords = location.latlng if location.ok else ["Unknown", "Unknown"]
-
-            for (x, y, w, h, label, score) in detections:
-                color = (0, 255, 0) if label == "Juliana" else (0, 0, 255)
-                cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-                cv2.putText(frame, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    def on_target(self, label, alert):
+        """Engine callback (worker thread) for every target detection."""
+        # Play Windows system ping sound
+        winsound.PlaySound("C:\\Windows\\Media\\Windows Notify.wav",
+                           winsound.SND_FILENAME | winsound.SND_ASYNC)
+        # on-screen alert is throttled by the engine
+        if alert:
+            self.root.after(0, lambda name=label: self.display_target_acquired(name))
 
-                self.session_data["total_faces"] += 1
-                if label == "Juliana":
-                    self.session_data["juliana_faces"] += 1
-                    folder = self.snapshot_folder_known
+    def on_source_finished(self):
+        """Engine callback: a recorded feed ran out, so end the session as if Stop was pressed."""
+        self.root.after(0, lambda: self.running and self.toggle_camera())
 
-    # Play Windows system ping sound
-                    winsound.PlaySound("C:\\Windows\\Media\\Windows Notify.wav",
-                                       winsound.SND_FILENAME | winsound.SND_ASYNC)
-
-    # Show on-screen alert only every 10 seconds
-                    current_time = time.time()
-                    last_time = self.last_engagement_time.get(label, 0)
-
-                    if current_time - last_time > 10:
-                        self.last_engagement_time[label] = current_time
-                        self.root.after(0, lambda: self.display_target_acquired(label))
-
-                else:
-                    self.session_data["unknown_faces"] += 1
-                    folder = self.snapshot_folder_unknown
-
-                self.session_data["detected_names"][label] = self.session_data["detected_names"].get(label, 0) + 1
-
-                if save_snapshot:
-                    snapshot = frame.copy()
-                    timestamp = now.strftime("%Y-%m-%d_%H-%M-%S")
-                    cv2.putText(snapshot, f"{label} @ {timestamp}", (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-                    cv2.putText(snapshot, f"Location: [{coords[0]}, {coords[1]}]", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-                    filename = f"{label}_{timestamp}.jpg"
-                    filepath = os.path.join(folder, filename)
-                    cv2.imwrite(filepath, snapshot)
-
-                    self.session_data["last_location"] = coords
-                    self.session_data["last_location_time"] = now.strftime("%H:%M:%S")
-
-            if save_snapshot:
-                self.last_snapshot_time = now
-
-            with self.frame_lock:
-                self.latest_frame = frame
     def render_frame_loop(self):
+        delay = RENDER_IDLE_MS
         if self.running:
-            with self.frame_lock:
-                frame = self.latest_frame.copy() if self.latest_frame is not None else None
+            frame, seq, interval = self.engine.latest()
+
+            if frame is not None and seq != self._drawn_seq:
+                timer = self.engine.metrics.timer()
+                self._drawn_seq = seq
+                img = Image.fromarray(frame)
+                photo = self._video_photo
+                if photo is None or (photo.width(), photo.height()) != img.size:
+                    photo = self._video_photo = ImageTk.PhotoImage(image=img)
+                    self.video_label.imgtk = photo
+                    self.video_label.configure(image=photo)
+                else:
+                    photo.paste(img)
+                timer.lap("render")
 
-            if frame is not None:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(frame_rgb)
-                imgtk = ImageTk.PhotoImage(image=img)
-                self.video_label.imgtk = imgtk
-                self.video_label.configure(image=imgtk)
+            delay = int(min(max(interval * 1000, RENDER_MIN_MS), RENDER_MAX_MS))
 
         if self.root.winfo_exists():
-            self.root.after(30, self.render_frame_loop)
-
-    def save_summary_to_file(self):
-        data = self.session_data
-        if not data["end_time"]:
-            return
-
-        duration = str(data["end_time"] - data["start_time"]).split(".")[0]
-        accuracy = (data["juliana_faces"] / data["total_faces"] * 100) if data["total_faces"] else 0
-
-        lines = [
-            f"Date: {data['start_time'].strftime('%B %d, %Y')}",
-            f"Session Duration: {duration}"
-        ]
-
-        if data["last_location"] and data["last_location_time"]:
-            lat, lon = data["last_location"]
-            lines.append(f"Last Known Location: [{lat}, {lon}] at {data['last_location_time']}")
-        else:
-            lines.append("Last Known Location: Unknown")
+            self.root.after(delay, self.render_frame_loop)
 
-        lines.append(f"Facial Recognition Accuracy: {accuracy:.2f}%")
-        lines.append("Detected Faces:")
-        for name, count in data["detected_names"].items():
-            lines.append(f"  - {name} ({count})")
-
-        lines.append("\nSnapshots saved in:")
-        lines.append(f"  - Known: {self.snapshot_folder_known}")
-        lines.append(f"  - Unknown: {self.snapshot_folder_unknown}")
-
-        with open(data["file_name"], "w") as f:
-            f.write("\n".join(lines))
-            
     def show_summary(self):
         """
         Open the most recent session summary.
@@ -521,13 +427,19 @@ class FaceRecognitionApp:
         messagebox.showinfo("No Summary", "No session summaries found yet. Run a session first.")
 
     def show_summary_from_file(self, filepath):
-        if not os.path.exists(filepath):
+        session_id = os.path.basename(filepath).replace("session_", "").replace(".txt", "")
+        session = self.event_store.session(session_id)
+        if session is not None and session["end_time"] and session["snapshot_known"]:
+            content = "\n".join(summary_lines(session, self.event_store.label_counts(session_id)))
+        elif os.path.exists(filepath):
+            # summaries written before the event store existed
+            session = None
+            with open(filepath, "r") as f:
+                content = f.read()
+        else:
             messagebox.showerror("Error", f"Summary file not found:\n{filepath}")
             return
 
-        with open(filepath, "r") as f:
-            content = f.read()
-
         body = self.open_panel("Session Summary")
         bg = self.get_bg()
         fg = self.get_fg()
@@ -548,50 +460,121 @@ class FaceRecognitionApp:
         map_canvas = Canvas(body, height=300, bg=bg, highlightthickness=0, bd=0)
         map_canvas.grid(row=0, column=1, sticky="nsew", padx=10, pady=10)
         try:
-            latlon = content.split("Last Known Location: [")[1].split("]")[0]
-            lat, lon = latlon.split(", ")
-            mapbox_token = "pk.eyJ1IjoianVsaWFuYTItNCIsImEiOiJjbWJ1dmN0cjUwOXc2MmxteHFjYzd5Z3R4In0.nviVNGXAt_oYWn3pRClM9Q"
-            map_url = (
-                f"https://api.mapbox.com/styles/v1/mapbox/streets-v11/static/"
-                f"pin-l+00ff00({lon},{lat})/{lon},{lat},14,0/400x300"
-                f"?access_token={mapbox_token}"
-            )
-            img_data = urllib.request.urlopen(map_url).read()
-            map_img = Image.open(BytesIO(img_data))
-            map_tk = ImageTk.PhotoImage(map_img)
+            if session is not None:
+                lat, lon = float(session["last_lat"]), float(session["last_lon"])
+            else:
+                latlon = content.split("Last Known Location: [")[1].split("]")[0]
+                lat, lon = (float(v) for v in latlon.split(", "))
+        except:
+            lat = lon = None
+
+        def show_map(img_data):
+            if not map_canvas.winfo_exists():
+                return
+            map_canvas.delete("placeholder")
+            if img_data is None:
+                map_canvas.create_text(200, 150, text="Map unavailable (offline?)",
+                                       fill=fg, font=("Segoe UI", 10))
+                return
+            try:
+                map_tk = ImageTk.PhotoImage(Image.open(BytesIO(img_data)))
+            except Exception:
+                return
             Label(body, text=f"Last known location of Juliana",
                   font=("Segoe UI", 12, "bold"), bg=bg, fg=fg).grid(row=1, column=1, pady=(0, 10))
             map_canvas.create_image(0, 0, anchor="nw", image=map_tk)
             map_canvas.image = map_tk
-        except:
-            pass
+
+        if lat is not None:
+            cached = self.map_cache.cached(lat, lon)
+            if cached is not None:
+                show_map(cached)
+            else:
+                map_canvas.create_text(200, 150, text="Loading map...", fill=fg,
+                                       font=("Segoe UI", 10), tags="placeholder")
+                self.map_cache.get_async(
+                    lat, lon, lambda data, err: self.root.after(0, lambda: show_map(data))
+                )
 
         # Snapshots
-        session_id = os.path.basename(filepath).replace("session_", "").replace(".txt", "")
         for idx, label in enumerate(["known", "unknown"]):
             dir_path = os.path.join("session_snapshots", session_id, label)
             frame = Frame(body, bg=bg)
             frame.grid(row=2, column=idx, padx=10, pady=5, sticky="nw")
             Label(frame, text=f"{label.capitalize()} Snapshots:",
                   font=("Segoe UI", 10, "bold"), bg=bg, fg=fg).pack(anchor="w")
-            for img_file in os.listdir(dir_path) if os.path.exists(dir_path) else []:
-                img_path = os.path.join(dir_path, img_file)
-                try:
-                    img = Image.open(img_path).resize((100, 100))
-                    thumb = ImageTk.PhotoImage(img)
-                    lbl = Label(frame, image=thumb, cursor="hand2", bg=bg)
-                    lbl.image = thumb
-                    lbl.pack(side="left", padx=5, pady=5)
-                    lbl.bind("<Button-1>", lambda e, path=img_path: self.show_full_image(path))
-                except:
-                    continue
+            self.build_snapshot_gallery(frame, dir_path)
 
         Button(body, text="Export Full Session",
-               command=lambda: self.export_session(filepath),
+               command=lambda: self.export_session(filepath, body),
                font=("Segoe UI", 10, "bold"), bg=btn_bg, fg=fg,
                activebackground=btn_bg, activeforeground=fg
                ).grid(row=3, column=0, columnspan=2, pady=12)
 
+    def build_snapshot_gallery(self, parent, dir_path):
+        """Paged thumbnail grid; only the visible page is decoded, on a worker thread."""
+        bg = self.get_bg()
+        fg = self.get_fg()
+        btn_bg = self.get_btn_bg()
+
+        paths = list_snapshots(dir_path)
+        pages = max(1, math.ceil(len(paths) / GALLERY_PAGE_SIZE))
+        current = {"page": 0}
+
+        grid = Frame(parent, bg=bg)
+        grid.pack(anchor="w")
+        nav = Frame(parent, bg=bg)
+        nav.pack(anchor="w", pady=(2, 0))
+
+        def fill(page, slots, thumbs):
+            if current["page"] != page:
+                return
+            for lbl, img in zip(slots, thumbs):
+                if img is None or not lbl.winfo_exists():
+                    continue
+                photo = ImageTk.PhotoImage(img)
+                lbl.config(image=photo, text="", width=THUMB_SIZE[0], height=THUMB_SIZE[1])
+                lbl.image = photo
+
+        def show_page(page):
+            current["page"] = page
+            for child in grid.winfo_children():
+                child.destroy()
+
+            page_paths = paths[page * GALLERY_PAGE_SIZE:(page + 1) * GALLERY_PAGE_SIZE]
+            slots = []
+            for i, img_path in enumerate(page_paths):
+                lbl = Label(grid, text="...", cursor="hand2", bg=bg, fg=fg)
+                lbl.grid(row=i // GALLERY_COLUMNS, column=i % GALLERY_COLUMNS, padx=5, pady=5)
+                lbl.bind("<Button-1>", lambda e, path=img_path: self.show_full_image(path))
+                slots.append(lbl)
+
+            page_label.config(text=f"Page {page + 1}/{pages} ({len(paths)} snapshots)")
+            prev_btn.config(state="normal" if page > 0 else "disabled")
+            next_btn.config(state="normal" if page < pages - 1 else "disabled")
+
+            def load():
+                thumbs = []
+                for img_path in page_paths:
+                    try:
+                        thumbs.append(load_thumbnail(img_path))
+                    except Exception:
+                        thumbs.append(None)
+                self.root.after(0, lambda: fill(page, slots, thumbs))
+
+            threading.Thread(target=load, daemon=True).start()
+
+        prev_btn = Button(nav, text="◀", width=3, command=lambda: show_page(current["page"] - 1),
+                          bg=btn_bg, fg=fg, activebackground=btn_bg, activeforeground=fg)
+        prev_btn.pack(side="left")
+        page_label = Label(nav, text="", font=("Segoe UI", 9), bg=bg, fg=fg)
+        page_label.pack(side="left", padx=6)
+        next_btn = Button(nav, text="▶", width=3, command=lambda: show_page(current["page"] + 1),
+                          bg=btn_bg, fg=fg, activebackground=btn_bg, activeforeground=fg)
+        next_btn.pack(side="left")
+
+        show_page(0)
+
     def show_full_image(self, path):
         top = Toplevel(self.root)
         top.title(os.path.basename(path))
@@ -601,7 +584,7 @@ class FaceRecognitionApp:
         lbl.image = photo
         lbl.pack()
 
-    def export_session(self, filepath):
+    def export_session(self, filepath, parent=None):
         session_id = os.path.basename(filepath).replace("session_", "").replace(".txt", "")
         dest = filedialog.asksaveasfilename(
             defaultextension=".zip",
@@ -610,23 +593,47 @@ class FaceRecognitionApp:
         )
         if not dest:
             return
+        self.start_export([session_id], dest, parent or self._panel_body)
 
-        temp_dir = f"temp_export_{session_id}"
-        os.makedirs(temp_dir, exist_ok=True)
-        shutil.copy(filepath, os.path.join(temp_dir, "session_summary.txt"))
-
-        for label in ["known", "unknown"]:
-            folder = os.path.join("session_snapshots", session_id, label)
-            if os.path.exists(folder):
-                shutil.copytree(folder, os.path.join(temp_dir, label), dirs_exist_ok=True)
+    def start_export(self, session_ids, dest, parent):
+        """Run a SessionExporter in the background with a progress line and Cancel button in `parent`."""
+        bg = self.get_bg()
+        fg = self.get_fg()
+        btn_bg = self.get_btn_bg()
 
-        with zipfile.ZipFile(dest, 'w') as zipf:
-            for foldername, _, filenames in os.walk(temp_dir):
-                for filename in filenames:
-                    zipf.write(os.path.join(foldername, filename),
-                               os.path.relpath(os.path.join(foldername, filename), temp_dir))
-        shutil.rmtree(temp_dir)
-        messagebox.showinfo("Exported", f"Session exported to:\n{dest}")
+        row = Frame(parent, bg=bg)
+        if parent.grid_slaves():
+            row.grid(row=99, column=0, columnspan=2, pady=(0, 12))
+        else:
+            row.pack(pady=(0, 12))
+        progress = Label(row, text="Exporting... 0%", font=("Segoe UI", 10), bg=bg, fg=fg)
+        progress.pack(side="left", padx=6)
+        cancel_btn = Button(row, text="Cancel", font=("Segoe UI", 9, "bold"),
+                            bg=btn_bg, fg=fg, activebackground=btn_bg, activeforeground=fg)
+        cancel_btn.pack(side="left")
+
+        def update(done, total):
+            if progress.winfo_exists():
+                pct = done / total * 100 if total else 100
+                progress.config(text=f"Exporting... {pct:.0f}% ({done // 1024} / {total // 1024} KB)")
+
+        def finished(path, error):
+            if row.winfo_exists():
+                row.destroy()
+            if error is None:
+                messagebox.showinfo("Exported", f"Session exported to:\n{path}")
+            elif isinstance(error, ExportCancelled):
+                messagebox.showinfo("Export Cancelled", "Export cancelled; no archive was written.")
+            else:
+                messagebox.showerror("Export Failed", f"Could not export session:\n{error}")
+
+        exporter = SessionExporter(
+            session_ids, dest,
+            on_progress=lambda done, total: self.root.after(0, lambda: update(done, total)),
+            on_done=lambda path, error: self.root.after(0, lambda: finished(path, error)),
+        )
+        cancel_btn.config(command=exporter.cancel)
+        exporter.start()
 
     def upload_picture(self):
         filepath = filedialog.askopenfilename(filetypes=[("Image files", "*.jpg;*.jpeg;*.png")])
@@ -652,30 +659,128 @@ class FaceRecognitionApp:
             messagebox.showerror("Error", f"Failed to save image: {e}")
 
     def reload_known_faces(self):
-        self.known_faces = load_known_faces("known_faces", self.face_cascade)
-        messagebox.showinfo("Reloaded", "Known faces reloaded.")
+        stats = self.engine.reload_known_faces()
+        messagebox.showinfo(
+            "Reloaded",
+            f"Known faces reloaded.\n{stats['processed']} new/changed, "
+            f"{stats['reused']} cached, {stats['evicted']} removed."
+        )
 
     def show_previous_sessions(self):
+        """Browse the session index a page at a time, filtered by date range and identity."""
         body = self.open_panel("All Summaries")
         bg = self.get_bg()
         fg = self.get_fg()
         btn_bg = self.get_btn_bg()
 
-        logs = sorted(os.listdir("session_logs"), reverse=True)
-        for f in logs:
-            if f.endswith(".txt"):
-                dt = datetime.strptime(
-                    f.replace("session_", "").replace(".txt", ""),
-                    "%Y-%m-%d_%H-%M-%S"
-                )
-                label = dt.strftime("%m/%d/%Y %H:%M")
-                btn = Button(
-                    body, text=label, width=40,
-                    command=lambda file=f: self.show_summary_from_file(os.path.join("session_logs", file)),
+        filters = Frame(body, bg=bg)
+        filters.pack(anchor="w", padx=10, pady=(8, 4))
+        entries = {}
+        for col, (key, text) in enumerate([("start", "From (YYYY-MM-DD)"), ("end", "To (YYYY-MM-DD)"),
+                                           ("label", "Identity")]):
+            Label(filters, text=text, font=("Segoe UI", 9), bg=bg, fg=fg).grid(row=0, column=col, sticky="w", padx=4)
+            entry = Entry(filters, width=16, font=("Segoe UI", 10))
+            entry.grid(row=1, column=col, padx=4)
+            entries[key] = entry
+
+        listing = Frame(body, bg=bg)
+        listing.pack(anchor="w", fill="x")
+        nav = Frame(body, bg=bg)
+        nav.pack(anchor="w", padx=10, pady=8)
+        state = {"page": 0, "query": {}}
+
+        def parse_date(text, label):
+            if not text.strip():
+                return None
+            try:
+                return datetime.strptime(text.strip(), "%Y-%m-%d")
+            except ValueError:
+                messagebox.showwarning("Invalid Date", f"{label} must look like 2025-06-30.")
+                raise
+
+        def show_page(page):
+            query = state["query"]
+            total = self.event_store.count_sessions(**query)
+            pages = max(1, math.ceil(total / SESSIONS_PAGE_SIZE))
+            page = max(0, min(page, pages - 1))
+            state["page"] = page
+
+            for child in listing.winfo_children():
+                child.destroy()
+            rows = self.event_store.list_sessions(limit=SESSIONS_PAGE_SIZE,
+                                                  offset=page * SESSIONS_PAGE_SIZE, **query)
+            for row in rows:
+                session_id = row["session_id"]
+                dt = datetime.strptime(session_id[:19], "%Y-%m-%d_%H-%M-%S")
+                text = dt.strftime("%m/%d/%Y %H:%M")
+                if "_cam" in session_id:
+                    text += f"  (camera {session_id.rsplit('_cam', 1)[1]})"
+                duration = str(timedelta(seconds=row["duration_s"] or 0))
+                text += f"   {duration}   faces: {row['total_faces'] or 0}   snapshots: {row['snapshot_count'] or 0}"
+                path = row["summary_file"] or os.path.join("session_logs", f"session_{session_id}.txt")
+                Button(
+                    listing, text=text, width=64, anchor="w",
+                    command=lambda file=path: self.show_summary_from_file(file),
                     bg=btn_bg, fg=fg, activebackground=btn_bg, activeforeground=fg,
                     font=("Segoe UI", 10, "bold")
-                )
-                btn.pack(pady=4, padx=10, anchor="w")
+                ).pack(pady=4, padx=10, anchor="w")
+            if not rows:
+                Label(listing, text="No sessions match.", font=("Segoe UI", 10), bg=bg, fg=fg).pack(padx=10, anchor="w")
+
+            page_label.config(text=f"Page {page + 1}/{pages} ({total} sessions)")
+            prev_btn.config(state="normal" if page > 0 else "disabled")
+            next_btn.config(state="normal" if page < pages - 1 else "disabled")
+
+        def export_listed():
+            total = self.event_store.count_sessions(**state["query"])
+            if not total:
+                return
+            dest = filedialog.asksaveasfilename(
+                defaultextension=".zip",
+                filetypes=[("Zip Files", "*.zip")],
+                initialfile=f"sessions_{datetime.now().strftime('%Y-%m-%d')}.zip"
+            )
+            if not dest:
+                return
+            rows = self.event_store.list_sessions(limit=total, **state["query"])
+            self.start_export([r["session_id"] for r in rows], dest, body)
+
+        def apply_filters():
+            try:
+                start = parse_date(entries["start"].get(), "From")
+                end = parse_date(entries["end"].get(), "To")
+            except ValueError:
+                return
+            state["query"] = {
+                "start": start,
+                "end": end + timedelta(days=1) if end else None,
+                "label": entries["label"].get().strip() or None,
+            }
+            show_page(0)
+
+        Button(filters, text="Apply", command=apply_filters, font=("Segoe UI", 9, "bold"),
+               bg=btn_bg, fg=fg, activebackground=btn_bg, activeforeground=fg,
+               width=8).grid(row=1, column=3, padx=6)
+        Button(filters, text="Export Listed", command=export_listed, font=("Segoe UI", 9, "bold"),
+               bg=btn_bg, fg=fg, activebackground=btn_bg, activeforeground=fg,
+               width=12).grid(row=1, column=4, padx=6)
+
+        prev_btn = Button(nav, text="◀ Newer", command=lambda: show_page(state["page"] - 1),
+                          bg=btn_bg, fg=fg, activebackground=btn_bg, activeforeground=fg)
+        prev_btn.pack(side="left")
+        page_label = Label(nav, text="", font=("Segoe UI", 9), bg=bg, fg=fg)
+        page_label.pack(side="left", padx=8)
+        next_btn = Button(nav, text="Older ▶", command=lambda: show_page(state["page"] + 1),
+                          bg=btn_bg, fg=fg, activebackground=btn_bg, activeforeground=fg)
+        next_btn.pack(side="left")
+
+        show_page(0)
+
+    def get_drone_sprites(self):
+        """Pre-rotated drone icons, built on first use and kept for the app's lifetime."""
+        if self._drone_sprites is None:
+            self._drone_sprites = DroneSprites(Image.open("drone_icon.png").resize((30, 30)))
+        return self._drone_sprites
 
     def plan_route(self):
         body = self.open_panel("Drone Route Planner")
@@ -685,106 +790,311 @@ class FaceRecognitionApp:
 
         route_color = "blue" if self.theme == "day" else "cyan"
         point_color = "black" if self.theme == "day" else "white"
+        area_color = "#888888"
         canvas_bg = "#ffffff" if self.theme == "day" else "#1e1e1e"
 
         canvas = Canvas(body, bg=canvas_bg, width=700, height=500, highlightthickness=0)
         canvas.pack(pady=10)
 
         try:
-            base_drone_img = Image.open("drone_icon.png").resize((30, 30))
+            sprites = self.get_drone_sprites()
         except Exception as e:
             messagebox.showerror("Image Error", f"Could not load drone icon:\n{e}")
             return
 
-        route_points, route_lines = [], []
+        route_points = []
+        # canvas items kept in step with route_points so edits touch only what changed;
+        # segment_items[i] joins points i and i+1
+        point_items, segment_items = [], []
+        closing_line = None
         drone = None
+        sim_job = None
         looping = False
+        # survey area for coverage sweeps: area_rings[0] is the outline, the rest are holes
+        mode = "route"
+        area_rings, area_items = [], []
+        ring_index = 0
 
         def draw_point(x, y):
-            canvas.create_oval(x-3, y-3, x+3, y+3, fill=point_color, outline=point_color)
+            point_items.append(
+                canvas.create_oval(x-3, y-3, x+3, y+3, fill=point_color, outline=point_color, tags="route"))
 
         def draw_line(p1, p2):
-            line = canvas.create_line(p1[0], p1[1], p2[0], p2[1], fill=route_color, width=2)
-            route_lines.append(line)
+            return canvas.create_line(p1[0], p1[1], p2[0], p2[1], fill=route_color, width=2, tags="route")
 
-        def redraw_route():
-            canvas.delete("all")
-            for i, (x, y) in enumerate(route_points):
-                draw_point(x, y)
-                if i > 0:
-                    draw_line(route_points[i-1], route_points[i])
+        def add_point(x, y):
+            if route_points:
+                segment_items.append(draw_line(route_points[-1], (x, y)))
+            route_points.append((x, y))
+            draw_point(x, y)
+
+        def update_closing_line():
+            """The loop's last -> first segment is the only item that depends on both ends."""
+            nonlocal closing_line
             if looping and len(route_points) > 2:
-                draw_line(route_points[-1], route_points[0])
+                (x1, y1), (x2, y2) = route_points[-1], route_points[0]
+                if closing_line is None:
+                    closing_line = draw_line((x1, y1), (x2, y2))
+                else:
+                    canvas.coords(closing_line, x1, y1, x2, y2)
+            elif closing_line is not None:
+                canvas.delete(closing_line)
+                closing_line = None
+
+        def redraw_route():
+            """Rebuild every route item; only for bulk changes (load, simplify)."""
+            nonlocal closing_line
+            # only the route; a running simulation keeps its drone item
+            canvas.delete("route")
+            point_items.clear()
+            segment_items.clear()
+            closing_line = None
+            points = route_points[:]
+            route_points.clear()
+            for x, y in points:
+                add_point(x, y)
+            update_closing_line()
+
+        def show_route_info(prefix=""):
+            route_info.config(text=f"{prefix}{len(route_points)} waypoints, "
+                                   f"{path_length(route_points, closed=looping):.0f} px")
+
+        def update_ring(i):
+            ring = area_rings[i]
+            if not ring:
+                if area_items[i] is not None:
+                    canvas.delete(area_items[i])
+                    area_items[i] = None
+                return
+            coords = [c for p in ring + ring[:1] for c in p]
+            if len(ring) == 1:
+                coords += coords
+            if area_items[i] is None:
+                area_items[i] = canvas.create_line(*coords, fill=area_color, width=2, dash=(6, 3), tags="area")
+            else:
+                canvas.coords(area_items[i], *coords)
 
         def on_click(event):
-            route_points.append((event.x, event.y))
-            redraw_route()
+            if mode == "route":
+                add_point(event.x, event.y)
+                update_closing_line()
+            else:
+                area_rings[ring_index].append((event.x, event.y))
+                update_ring(ring_index)
+
+        def cycle_mode():
+            nonlocal mode, ring_index
+            mode = {"route": "area", "area": "hole", "hole": "route"}[mode]
+            if mode == "area":
+                if not area_rings:
+                    area_rings.append([])
+                    area_items.append(None)
+                ring_index = 0
+            elif mode == "hole":
+                area_rings.append([])
+                area_items.append(None)
+                ring_index = len(area_rings) - 1
+            mode_btn.config(text=f"Draw: {mode.title()}")
+
+        def stop_simulation():
+            nonlocal drone, sim_job
+            if sim_job is not None:
+                body.after_cancel(sim_job)
+                sim_job = None
+            if drone:
+                canvas.delete(drone)
+                drone = None
 
         def reset_route():
-            nonlocal drone
+            nonlocal closing_line, ring_index, mode
+            stop_simulation()
             route_points.clear()
-            for line in route_lines:
-                canvas.delete(line)
-            route_lines.clear()
+            point_items.clear()
+            segment_items.clear()
+            closing_line = None
+            area_rings.clear()
+            area_items.clear()
+            if mode != "route":
+                # a fresh outline first, even if the button said Hole
+                mode = "area"
+                mode_btn.config(text="Draw: Area")
+                area_rings.append([])
+                area_items.append(None)
+            ring_index = 0
             canvas.delete("all")
-            drone = None
+            route_info.config(text="")
+            flight_info.config(text="")
 
         def undo_last():
+            if mode != "route":
+                if area_rings[ring_index]:
+                    area_rings[ring_index].pop()
+                    update_ring(ring_index)
+                return
             if route_points:
                 route_points.pop()
-                redraw_route()
+                canvas.delete(point_items.pop())
+                if segment_items:
+                    canvas.delete(segment_items.pop())
+                update_closing_line()
 
         def toggle_loop():
             nonlocal looping
             looping = not looping
             loop_btn.config(text="Loop: ON" if looping else "Loop: OFF")
+            update_closing_line()
+
+        def load_route():
+            filepath = filedialog.askopenfilename(initialfile=ROUTE_FILE, filetypes=[("Route files", "*.json")])
+            if not filepath:
+                return
+            try:
+                with open(filepath, "r") as f:
+                    points = [(float(x), float(y)) for x, y in json.load(f)]
+            except (OSError, ValueError, TypeError) as e:
+                messagebox.showerror("Load Failed", f"Could not read route:\n{e}")
+                return
+            stop_simulation()
+            route_points[:] = points
             redraw_route()
+            show_route_info("Loaded ")
+
+        def simplify():
+            try:
+                tolerance = float(tolerance_entry.get())
+            except ValueError:
+                messagebox.showwarning("Invalid Tolerance", "Tolerance must be a number of pixels.")
+                return
+            stop_simulation()
+            before = len(route_points)
+            route_points[:] = simplify_route(route_points, tolerance, closed=looping)
+            redraw_route()
+            show_route_info(f"Simplified {before} -> ")
+            settings = self.load_settings()
+            settings["route_simplify_tolerance"] = tolerance
+            save_settings(settings)
+
+        def save_route():
+            filepath = filedialog.asksaveasfilename(initialfile=ROUTE_FILE, defaultextension=".json",
+                                                    filetypes=[("Route files", "*.json")])
+            if not filepath:
+                return
+            with open(filepath, "w") as f:
+                json.dump([list(p) for p in route_points], f)
+
+        def generate_coverage():
+            outer = area_rings[0] if area_rings else []
+            if len(outer) < 3:
+                messagebox.showwarning("No Area", "Switch to Draw: Area and click at least three corners first.")
+                return
+            try:
+                spacing = float(spacing_entry.get())
+                angle_text = angle_entry.get().strip().lower()
+                angle = None if angle_text in ("", "auto") else float(angle_text)
+            except ValueError:
+                messagebox.showwarning("Invalid Value", "Spacing must be a number of pixels; angle degrees or 'auto'.")
+                return
+            if spacing <= 0:
+                messagebox.showwarning("Invalid Value", "Spacing must be greater than zero.")
+                return
+            start = route_points[0] if route_points else None
+            points = coverage_path(outer, [r for r in area_rings[1:] if len(r) >= 3], spacing, angle, start=start)
+            if not points:
+                messagebox.showwarning("No Coverage", "The area is narrower than the track spacing; "
+                                                      "reduce the spacing or draw a larger area.")
+                return
+            stop_simulation()
+            route_points[:] = points
+            redraw_route()
+            show_route_info("Coverage: ")
+            settings = self.load_settings()
+            settings["coverage_spacing"] = spacing
+            settings["coverage_angle"] = angle
+            save_settings(settings)
+
+        def optimize():
+            if len(route_points) < 3:
+                messagebox.showwarning("Not Enough Points", "Draw at least three points to optimize.")
+                return
+            stop_simulation()
+            before = path_length(route_points, closed=looping)
+            points = optimize_route(route_points, closed=looping, fix_start=fix_start.get())
+            after = path_length(points, closed=looping)
+            if after >= before:
+                route_info.config(text=f"Optimized: {before:.0f} px, no shorter order found")
+                return
+            route_points[:] = points
+            redraw_route()
+            saved = (1 - after / before) * 100 if before else 0.0
+            route_info.config(text=f"Optimized: {before:.0f} px -> {after:.0f} px ({saved:.1f}% shorter), "
+                                   f"{len(route_points)} waypoints")
 
         def simulate_drone():
             nonlocal drone
             if len(route_points) < 2:
                 messagebox.showwarning("Not Enough Points", "Draw at least two points to simulate.")
                 return
-            if drone:
-                canvas.delete(drone)
+            stop_simulation()
 
-            path = route_points[:]
-            if looping and len(path) >= 2:
-                path.append(route_points[0])
-
-            segments, angles = [], []
-            for i in range(len(path) - 1):
-                x1, y1 = path[i]
-                x2, y2 = path[i + 1]
-                dx, dy = x2 - x1, y2 - y1
-                angle = -1 * (180 / 3.14159) * (dy / (abs(dx) + 1e-5))
-                dist = (dx**2 + dy**2) ** 0.5
-                steps = max(1, int(dist // 2))
-                for j in range(steps):
-                    t = j / steps
-                    x = x1 + t * dx
-                    y = y1 + t * dy
-                    segments.append((x, y))
-                    angles.append(angle)
-
-            def move(i=0):
-                nonlocal drone
-                if i < len(segments):
-                    x, y = segments[i]
-                    angle = angles[i]
-                    rotated_img = base_drone_img.rotate(angle, expand=True)
-                    rotated_photo = ImageTk.PhotoImage(rotated_img)
-                    if canvas.winfo_exists():
-                        if drone:
-                            canvas.delete(drone)
-                        drone = canvas.create_image(x, y, image=rotated_photo)
-                        canvas.image = rotated_photo
-                        body.after(10, lambda: move(i + 1))
-                elif looping:
-                    simulate_drone()
+            settings = self.load_settings()
+            try:
+                trajectory = make_flight_profile(settings).plan(route_points, closed=looping)
+            except ValueError as e:
+                messagebox.showwarning("Invalid Flight Settings", str(e))
+                return
+            if trajectory is None:
+                messagebox.showwarning("Not Enough Points", "The route has no length to fly.")
+                return
+            duration = trajectory.duration
+            settings["sim_playback_speed"] = playback_speed()
+            save_settings(settings)
+
+            xy, heading, _ = trajectory.sample(0.0)
+            shown = sprites.index(heading)
+            drone = canvas.create_image(*xy, image=sprites.image(shown))
+            sim_time, last_tick = 0.0, time.perf_counter()
+
+            def move():
+                nonlocal sim_job, shown, sim_time, last_tick
+                sim_job = None
+                if not canvas.winfo_exists() or drone is None:
+                    return
+                now = time.perf_counter()
+                sim_time += (now - last_tick) * playback_speed()
+                last_tick = now
+                arrived = sim_time >= duration and not looping
+                if looping:
+                    sim_time %= duration
+
+                xy, heading, speed = trajectory.sample(sim_time)
+                canvas.coords(drone, *xy)
+                sprite = sprites.index(heading)
+                if sprite != shown:
+                    canvas.itemconfigure(drone, image=sprites.image(sprite))
+                    shown = sprite
+                if arrived:
+                    flight_info.config(text=f"Arrived: flight time {format_duration(duration)}")
+                    return
+                leg = int(trajectory.leg_index(sim_time))
+                flight_info.config(text=f"{format_duration(sim_time)} / {format_duration(duration)}, "
+                                        f"{speed:.1f} m/s, next waypoint in "
+                                        f"{trajectory.times[leg + 1] - sim_time:.1f} s")
+                sim_job = body.after(SIM_FRAME_MS, move)
 
             move()
 
+        playback = [float(self.load_settings()["sim_playback_speed"])]
+
+        def playback_speed():
+            """Current fast-forward factor; a half-typed or invalid entry keeps the last good one."""
+            try:
+                value = float(playback_entry.get())
+            except ValueError:
+                return playback[0]
+            if value > 0:
+                playback[0] = value
+            return playback[0]
+
         canvas.bind("<Button-1>", on_click)
 
         control = Frame(body, bg=bg)
@@ -802,6 +1112,65 @@ class FaceRecognitionApp:
         Button(control, text="Reset Route", command=reset_route,
                font=("Segoe UI", 11, "bold"), bg=btn_bg, fg=fg,
                activebackground=btn_bg, activeforeground=fg, width=16).grid(row=1, column=1, padx=10)
+        Button(control, text="Load Route", command=load_route,
+               font=("Segoe UI", 11, "bold"), bg=btn_bg, fg=fg,
+               activebackground=btn_bg, activeforeground=fg, width=16).grid(row=2, column=0, padx=10, pady=5)
+        Button(control, text="Simplify", command=simplify,
+               font=("Segoe UI", 11, "bold"), bg=btn_bg, fg=fg,
+               activebackground=btn_bg, activeforeground=fg, width=16).grid(row=2, column=1, padx=10)
+
+        tolerance_row = Frame(control, bg=bg)
+        tolerance_row.grid(row=3, column=0, columnspan=2, pady=5)
+        Label(tolerance_row, text="Simplify tolerance (px):", font=("Segoe UI", 10),
+              bg=bg, fg=fg).pack(side="left", padx=(0, 6))
+        tolerance_entry = Entry(tolerance_row, width=6)
+        tolerance_entry.insert(0, str(self.load_settings()["route_simplify_tolerance"]))
+        tolerance_entry.pack(side="left")
+
+        fix_start = tk.BooleanVar(value=True)
+        tk.Checkbutton(tolerance_row, text="Keep start point", variable=fix_start,
+                       bg=bg, fg=fg, selectcolor=btn_bg, activebackground=bg,
+                       activeforeground=fg).pack(side="left", padx=(16, 0))
+        Button(control, text="Optimize Route", command=optimize,
+               font=("Segoe UI", 11, "bold"), bg=btn_bg, fg=fg,
+               activebackground=btn_bg, activeforeground=fg, width=16).grid(row=4, column=0, padx=10, pady=5)
+        Button(control, text="Save Route", command=save_route,
+               font=("Segoe UI", 11, "bold"), bg=btn_bg, fg=fg,
+               activebackground=btn_bg, activeforeground=fg, width=16).grid(row=4, column=1, padx=10)
+        mode_btn = Button(control, text="Draw: Route", command=cycle_mode,
+                          font=("Segoe UI", 11, "bold"), bg=btn_bg, fg=fg,
+                          activebackground=btn_bg, activeforeground=fg, width=16)
+        mode_btn.grid(row=5, column=0, padx=10, pady=5)
+        Button(control, text="Generate Coverage", command=generate_coverage,
+               font=("Segoe UI", 11, "bold"), bg=btn_bg, fg=fg,
+               activebackground=btn_bg, activeforeground=fg, width=16).grid(row=5, column=1, padx=10)
+
+        coverage_row = Frame(control, bg=bg)
+        coverage_row.grid(row=6, column=0, columnspan=2, pady=5)
+        settings = self.load_settings()
+        Label(coverage_row, text="Track spacing (px):", font=("Segoe UI", 10),
+              bg=bg, fg=fg).pack(side="left", padx=(0, 6))
+        spacing_entry = Entry(coverage_row, width=6)
+        spacing_entry.insert(0, str(settings["coverage_spacing"]))
+        spacing_entry.pack(side="left")
+        Label(coverage_row, text="Sweep angle (deg):", font=("Segoe UI", 10),
+              bg=bg, fg=fg).pack(side="left", padx=(16, 6))
+        angle_entry = Entry(coverage_row, width=6)
+        angle_entry.insert(0, "auto" if settings["coverage_angle"] is None else str(settings["coverage_angle"]))
+        angle_entry.pack(side="left")
+
+        playback_row = Frame(control, bg=bg)
+        playback_row.grid(row=7, column=0, columnspan=2, pady=5)
+        Label(playback_row, text="Playback speed (x):", font=("Segoe UI", 10),
+              bg=bg, fg=fg).pack(side="left", padx=(0, 6))
+        playback_entry = Entry(playback_row, width=6)
+        playback_entry.insert(0, str(playback[0]))
+        playback_entry.pack(side="left")
+
+        route_info = Label(body, text="", font=("Segoe UI", 10), bg=bg, fg=fg)
+        route_info.pack()
+        flight_info = Label(body, text="", font=("Segoe UI", 10), bg=bg, fg=fg)
+        flight_info.pack(pady=(0, 10))
 
 
     def prompt_engage(self, name):
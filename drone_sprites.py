@@ -0,0 +1,31 @@
+import math
+
+from PIL import Image, ImageTk
+
+SPRITE_STEP_DEG = 5  # angular resolution of the pre-rotated icons
+
+
+def heading_deg(dx, dy):
+    """Heading of a screen-space move in PIL rotate() terms: 0 = east, 90 = north (canvas y grows downwards)."""
+    return math.degrees(math.atan2(-dy, dx))
+
+
+class DroneSprites:
+    """
+    The drone icon pre-rotated every `step_deg` degrees, so the route
+    simulator only ever swaps between existing PhotoImages. Needs a Tk root.
+    """
+
+    def __init__(self, base_img, step_deg=SPRITE_STEP_DEG):
+        self.step_deg = step_deg
+        self.count = int(round(360 / step_deg))
+        self.images = [
+            ImageTk.PhotoImage(base_img.rotate(i * step_deg, resample=Image.BICUBIC, expand=True))
+            for i in range(self.count)
+        ]
+
+    def index(self, heading):
+        return int(round(heading / self.step_deg)) % self.count
+
+    def image(self, index):
+        return self.images[index]
@@ -0,0 +1,384 @@
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from annotation import TARGET_LABEL
+
+EVENTS_DB = "session_logs/events.db"
+BATCH_MAX = 500
+FLUSH_INTERVAL = 0.5  # seconds a partial batch may wait before it is committed
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    summary_file TEXT,
+    snapshot_known TEXT,
+    snapshot_unknown TEXT,
+    last_lat TEXT,
+    last_lon TEXT,
+    last_location_time TEXT,
+    stats TEXT
+);
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    seq INTEGER,
+    label TEXT NOT NULL,
+    score REAL,
+    x INTEGER, y INTEGER, w INTEGER, h INTEGER,
+    lat TEXT, lon TEXT,
+    snapshot_path TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_detections_session ON detections(session_id, ts);
+CREATE INDEX IF NOT EXISTS idx_detections_label ON detections(session_id, label);
+CREATE TABLE IF NOT EXISTS session_labels (
+    session_id TEXT NOT NULL,
+    label TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (session_id, label)
+);
+CREATE INDEX IF NOT EXISTS idx_session_labels_label ON session_labels(label, session_id);
+"""
+
+# summary columns for the All Summaries browser, filled in by finalize_session()
+INDEX_COLUMNS = {
+    "duration_s": "INTEGER",
+    "total_faces": "INTEGER",
+    "target_faces": "INTEGER",
+    "unknown_faces": "INTEGER",
+    "snapshot_count": "INTEGER",
+}
+
+SESSION_COLUMNS = (
+    "session_id", "start_time", "end_time", "summary_file", "snapshot_known",
+    "snapshot_unknown", "last_lat", "last_lon", "last_location_time", "stats",
+) + tuple(INDEX_COLUMNS)
+
+
+class EventStore:
+    """
+    SQLite record of every detection plus one row per session.
+
+    Writes are queued and committed by a single background thread in
+    batched transactions, so the capture pipeline never waits on disk.
+    Reads open their own connection (WAL mode lets them run alongside).
+    """
+
+    def __init__(self, path=EVENTS_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            for column, kind in INDEX_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE sessions ADD COLUMN {column} {kind}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start_time)")
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="event-store", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # --- writes (any thread) ---------------------------------------------
+
+    def save_session(self, session_id, **fields):
+        """Insert or update the session row; only the given columns are changed."""
+        if "stats" in fields and not isinstance(fields["stats"], (str, type(None))):
+            fields["stats"] = json.dumps(fields["stats"])
+        for key in ("start_time", "end_time"):
+            if isinstance(fields.get(key), datetime):
+                fields[key] = fields[key].isoformat(sep=" ", timespec="seconds")
+        self._queue.put(("session", session_id, fields))
+
+    def record_detections(self, session_id, timestamp, seq, detections, coords=None, snapshot_paths=None):
+        """Queue one row per detection in a frame."""
+        if not detections:
+            return
+        lat, lon = coords if coords else (None, None)
+        ts = timestamp.isoformat(sep=" ", timespec="milliseconds")
+        rows = []
+        for i, (x, y, w, h, label, score) in enumerate(detections):
+            path = snapshot_paths[i] if snapshot_paths else None
+            rows.append((session_id, ts, seq, label, float(score), int(x), int(y), int(w), int(h),
+                         _text(lat), _text(lon), path))
+        self._queue.put(("detections", rows, None))
+
+    def finalize_session(self, session_id):
+        """Queue the index update (counts, duration, per-label totals) for a finished session."""
+        self._queue.put(("finalize", session_id, None))
+
+    def flush(self):
+        """Block until everything queued so far is committed."""
+        self._queue.join()
+
+    # --- background writer ----------------------------------------------
+
+    def _run(self):
+        conn = self._connect()
+        while True:
+            try:
+                first = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < BATCH_MAX:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    for kind, a, b in batch:
+                        if kind == "detections":
+                            conn.executemany(
+                                "INSERT INTO detections (session_id, ts, seq, label, score, x, y, w, h, "
+                                "lat, lon, snapshot_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", a)
+                        elif kind == "finalize":
+                            self._finalize(conn, a)
+                        elif kind == "legacy_labels":
+                            conn.executemany(
+                                "INSERT OR REPLACE INTO session_labels (session_id, label, count) VALUES (?, ?, ?)",
+                                [(a, label, count) for label, count in b.items()])
+                        else:
+                            self._upsert_session(conn, a, b)
+            except sqlite3.Error as e:
+                print(f"Event store write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _upsert_session(self, conn, session_id, fields):
+        fields = {k: v for k, v in fields.items() if k in SESSION_COLUMNS}
+        conn.execute("INSERT OR IGNORE INTO sessions (session_id, start_time) VALUES (?, ?)",
+                     (session_id, fields.get("start_time", "")))
+        if fields:
+            assignments = ", ".join(f"{k} = ?" for k in fields)
+            conn.execute(f"UPDATE sessions SET {assignments} WHERE session_id = ?",
+                         (*fields.values(), session_id))
+
+    def _finalize(self, conn, session_id):
+        conn.execute("DELETE FROM session_labels WHERE session_id = ?", (session_id,))
+        conn.execute(
+            "INSERT INTO session_labels (session_id, label, count) "
+            "SELECT session_id, label, COUNT(*) FROM detections WHERE session_id = ? GROUP BY label",
+            (session_id,))
+        conn.execute(
+            """UPDATE sessions SET
+                duration_s = CAST(ROUND((julianday(end_time) - julianday(start_time)) * 86400) AS INTEGER),
+                total_faces = (SELECT COALESCE(SUM(count), 0) FROM session_labels WHERE session_id = ?1),
+                target_faces = (SELECT COALESCE(SUM(count), 0) FROM session_labels
+                                WHERE session_id = ?1 AND label = ?2),
+                unknown_faces = (SELECT COALESCE(SUM(count), 0) FROM session_labels
+                                 WHERE session_id = ?1 AND label != ?2),
+                snapshot_count = (SELECT COUNT(*) FROM detections
+                                  WHERE session_id = ?1 AND snapshot_path IS NOT NULL)
+            WHERE session_id = ?1""",
+            (session_id, TARGET_LABEL))
+
+    # --- reads ------------------------------------------------------------
+
+    def session(self, session_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        session = dict(row)
+        session["stats"] = json.loads(session["stats"]) if session["stats"] else {}
+        return session
+
+    def label_counts(self, session_id):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT label, COUNT(*) FROM detections WHERE session_id = ? "
+                "GROUP BY label ORDER BY MIN(id)", (session_id,)
+            ).fetchall()
+        return {label: count for label, count in rows}
+
+    def _session_filter(self, start=None, end=None, label=None):
+        sql = " FROM sessions s WHERE s.end_time IS NOT NULL"
+        args = []
+        if start:
+            sql += " AND s.start_time >= ?"
+            args.append(start.isoformat(sep=" ", timespec="seconds"))
+        if end:
+            sql += " AND s.start_time < ?"
+            args.append(end.isoformat(sep=" ", timespec="seconds"))
+        if label:
+            sql += " AND EXISTS (SELECT 1 FROM session_labels l WHERE l.session_id = s.session_id AND l.label = ?)"
+            args.append(label)
+        return sql, args
+
+    def list_sessions(self, start=None, end=None, label=None, limit=20, offset=0):
+        """One page of finished sessions, newest first, optionally filtered by date range and identity."""
+        where, args = self._session_filter(start, end, label)
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT s.session_id, s.start_time, s.end_time, s.summary_file, s.duration_s, "
+                "s.total_faces, s.target_faces, s.unknown_faces, s.snapshot_count"
+                + where + " ORDER BY s.start_time DESC LIMIT ? OFFSET ?",
+                args + [limit, offset]
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def count_sessions(self, start=None, end=None, label=None):
+        where, args = self._session_filter(start, end, label)
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*)" + where, args).fetchone()[0]
+
+    def import_legacy_summaries(self, log_dir):
+        """
+        Add index rows for .txt summaries written before the event store
+        existed, so they show up in the browser. Already-indexed files are skipped.
+        """
+        if not os.path.isdir(log_dir):
+            return 0
+        with self._connect() as conn:
+            known = {r[0] for r in conn.execute("SELECT session_id FROM sessions")}
+
+        imported = 0
+        for name in os.listdir(log_dir):
+            if not (name.startswith("session_") and name.endswith(".txt")):
+                continue
+            session_id = name[len("session_"):-len(".txt")]
+            if session_id in known:
+                continue
+            try:
+                fields, counts = _parse_legacy_summary(os.path.join(log_dir, name), session_id)
+            except (OSError, ValueError):
+                continue
+            self._queue.put(("session", session_id, fields))
+            self._queue.put(("legacy_labels", session_id, counts))
+            imported += 1
+        self.flush()
+        return imported
+
+    def detections(self, session_id, label=None, limit=None):
+        sql = "SELECT * FROM detections WHERE session_id = ?"
+        args = [session_id]
+        if label is not None:
+            sql += " AND label = ?"
+            args.append(label)
+        sql += " ORDER BY ts"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._connect() as conn:
+            return [dict(r) for r in conn.execute(sql, args).fetchall()]
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def _parse_legacy_summary(path, session_id):
+    with open(path, "r") as f:
+        content = f.read()
+
+    start = datetime.strptime(session_id[:19], "%Y-%m-%d_%H-%M-%S")
+    # str(timedelta): "2:03:04", or "1 day, 2:03:04" past 24 hours
+    duration = re.search(r"Session Duration: (?:(\d+) days?, )?(\d+):(\d+):(\d+)", content)
+    seconds = 0
+    if duration:
+        d, h, m, s = (int(v or 0) for v in duration.groups())
+        seconds = d * 86400 + h * 3600 + m * 60 + s
+
+    counts = {}
+    if "Detected Faces:" in content:
+        for line in content.split("Detected Faces:")[1].splitlines():
+            match = re.match(r"\s+- (.+) \((\d+)\)$", line)
+            if match:
+                counts[match.group(1)] = int(match.group(2))
+            elif line.strip():
+                break
+
+    fields = {
+        "start_time": start.isoformat(sep=" ", timespec="seconds"),
+        "end_time": datetime.fromtimestamp(start.timestamp() + seconds).isoformat(sep=" ", timespec="seconds"),
+        "summary_file": path,
+        "duration_s": seconds,
+        "total_faces": sum(counts.values()),
+        "target_faces": counts.get(TARGET_LABEL, 0),
+        "unknown_faces": sum(counts.values()) - counts.get(TARGET_LABEL, 0),
+    }
+    location = re.search(r"Last Known Location: \[(.+?), (.+?)\] at (\S+)", content)
+    if location:
+        fields["last_lat"], fields["last_lon"], fields["last_location_time"] = location.groups()
+    return fields, counts
+
+
+def summary_lines(session, counts):
+    """Render the human-readable session summary from a stored session and its label counts."""
+    start = datetime.fromisoformat(session["start_time"])
+    end = datetime.fromisoformat(session["end_time"]) if session["end_time"] else start
+    duration = str(end - start).split(".")[0]
+    total = sum(counts.values())
+    target = counts.get(TARGET_LABEL, 0)
+    accuracy = (target / total * 100) if total else 0
+    stats = session["stats"] or {}
+
+    lines = [
+        f"Date: {start.strftime('%B %d, %Y')}",
+        f"Session Duration: {duration}"
+    ]
+
+    if session["last_lat"] is not None and session["last_location_time"]:
+        lines.append(f"Last Known Location: [{session['last_lat']}, {session['last_lon']}] "
+                     f"at {session['last_location_time']}")
+    else:
+        lines.append("Last Known Location: Unknown")
+
+    lines.append(f"Facial Recognition Accuracy: {accuracy:.2f}%")
+
+    latency = stats.get("latency")
+    if latency:
+        lines.append(
+            f"Pipeline Latency: avg {latency['mean_ms']:.0f} ms, "
+            f"p95 {latency['p95_ms']:.0f} ms over {latency['frames']} frames "
+            f"({stats.get('dropped_frames', 0)} stale frames dropped)"
+        )
+
+    snaps = stats.get("snapshots")
+    if snaps:
+        lines.append(
+            f"Snapshots: {snaps['written']} written, {snaps['dropped']} dropped "
+            f"(writer queue peak {snaps['peak_pending']})"
+        )
+        if snaps.get("deduplicated"):
+            lines.append(f"Duplicate Snapshots: {snaps['deduplicated']} not written, events point to the "
+                         f"earlier shot (~{snaps['bytes_saved'] / (1024 * 1024):.1f} MB saved)")
+
+    clips = stats.get("clips")
+    if clips:
+        lines.append(f"Clips: {clips['clips']} recorded ({clips['dropped_frames']} frames skipped by the buffer)")
+
+    recognition = stats.get("recognition")
+    if recognition:
+        lines.append(f"Recognition: {recognition['recognized']} gallery lookups, "
+                     f"{recognition['reused']} reused from {recognition['tracks']} face tracks")
+
+    lines.append("Detected Faces:")
+    for name, count in counts.items():
+        lines.append(f"  - {name} ({count})")
+
+    appearances = stats.get("appearances")
+    if appearances:
+        lines.append("Distinct Appearances:")
+        for name, count in sorted(appearances.items(), key=lambda item: -item[1]):
+            lines.append(f"  - {name} ({count})")
+
+    lines.append("\nSnapshots saved in:")
+    lines.append(f"  - Known: {session['snapshot_known']}")
+    lines.append(f"  - Unknown: {session['snapshot_unknown']}")
+    return lines
@@ -0,0 +1,111 @@
+import os
+
+import cv2
+import numpy as np
+
+FACE_SIZE = (100, 100)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def label_from_filename(filename):
+    """'Juliana_face_3.jpg' -> 'Juliana' (matches the naming used by Upload Pictures)."""
+    stem = os.path.splitext(filename)[0]
+    return stem.split("_face_")[0]
+
+
+def encode_known_face(path, face_cascade):
+    """
+    Return the grayscale face crop used as a template, or None if no face is
+    found: the largest cascade detection resized to FACE_SIZE. This is the
+    app's own enrollment encoding for FaceGallery, not the output of
+    recognize_juliana_2_6_25.load_known_faces.
+    """
+    img = cv2.imread(path)
+    if img is None:
+        return None
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
+    if len(faces) == 0:
+        return None
+    x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+    return cv2.resize(gray[y:y + h, x:x + w], FACE_SIZE)
+
+
+class KnownFaceCache:
+    """
+    Keeps the encode_known_face() templates in an .npz next to the
+    known-faces folder, keyed by file name, size and mtime, so a reload
+    only decodes images that were added or changed since the last run.
+    """
+
+    def __init__(self, folder, face_cascade, cache_file=None):
+        self.folder = folder
+        self.face_cascade = face_cascade
+        if cache_file is None:
+            folder_path = os.path.abspath(folder)
+            cache_file = os.path.join(os.path.dirname(folder_path),
+                                      os.path.basename(folder_path) + "_cache.npz")
+        self.cache_file = cache_file
+        self.stats = {"reused": 0, "processed": 0, "evicted": 0}
+
+    def load(self):
+        """Sync the cache with the folder and return a list of (label, face) pairs."""
+        cached = self._read_cache()
+        entries = {}
+        reused = processed = 0
+
+        files = sorted(os.listdir(self.folder)) if os.path.isdir(self.folder) else []
+        for filename in files:
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            st = os.stat(os.path.join(self.folder, filename))
+            key = (st.st_size, st.st_mtime_ns)
+            entry = cached.get(filename)
+            if entry is not None and entry[0] == key:
+                entries[filename] = entry
+                reused += 1
+                continue
+            face = encode_known_face(os.path.join(self.folder, filename), self.face_cascade)
+            entries[filename] = (key, label_from_filename(filename), face)
+            processed += 1
+
+        evicted = len(set(cached) - set(entries))
+        self.stats = {"reused": reused, "processed": processed, "evicted": evicted}
+        if processed or evicted:
+            self._write_cache(entries)
+
+        return [(label, face) for _, label, face in entries.values() if face is not None]
+
+    def _read_cache(self):
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with np.load(self.cache_file, allow_pickle=False) as data:
+                faces = data["faces"]
+                return {
+                    str(name): ((int(size), int(mtime)), str(label), faces[i] if valid else None)
+                    for i, (name, size, mtime, label, valid) in enumerate(zip(
+                        data["names"], data["sizes"], data["mtimes"], data["labels"], data["valid"]
+                    ))
+                }
+        except Exception:
+            # unreadable or older layout: rebuild from scratch
+            return {}
+
+    def _write_cache(self, entries):
+        names = list(entries)
+        blank = np.zeros(FACE_SIZE[::-1], dtype=np.uint8)
+        faces = [entries[n][2] for n in names]
+        tmp = self.cache_file + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                names=np.array(names, dtype=str),
+                sizes=np.array([entries[n][0][0] for n in names], dtype=np.int64),
+                mtimes=np.array([entries[n][0][1] for n in names], dtype=np.int64),
+                labels=np.array([entries[n][1] for n in names], dtype=str),
+                valid=np.array([face is not None for face in faces], dtype=bool),
+                faces=np.array([blank if face is None else face for face in faces],
+                               dtype=np.uint8).reshape(-1, FACE_SIZE[1], FACE_SIZE[0]),
+            )
+        os.replace(tmp, self.cache_file)
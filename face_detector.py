@@ -0,0 +1,100 @@
+import cv2
+import numpy as np
+
+DEFAULT_DOWNSCALE = 0.5
+DEFAULT_MIN_FACE = 40     # pixels, at full resolution
+DEFAULT_ROI_MARGIN = 0.5  # ROI = box grown by this fraction of its size on every side
+ROI_MEMORY = 3            # detection passes a face keeps its ROI after it was last seen
+
+
+def box_iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = min(ax + aw, bx + bw) - max(ax, bx)
+    ih = min(ay + ah, by + bh) - max(ay, by)
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+def _merge_rois(rois):
+    """Union overlapping (x0, y0, x1, y1) rectangles so no area is searched twice."""
+    merged = []  # pairwise disjoint
+    for roi in sorted(rois):
+        # a grown rectangle can reach ones it missed before, so rescan after every union
+        i = 0
+        while i < len(merged):
+            m = merged[i]
+            if roi[0] < m[2] and m[0] < roi[2] and roi[1] < m[3] and m[1] < roi[3]:
+                roi = (min(m[0], roi[0]), min(m[1], roi[1]), max(m[2], roi[2]), max(m[3], roi[3]))
+                merged.pop(i)
+                i = 0
+            else:
+                i += 1
+        merged.append(roi)
+    return merged
+
+
+class MultiResolutionDetector:
+    """
+    Runs the cascade on a downscaled copy of the frame to find candidates,
+    then re-runs it at full resolution only inside regions of interest
+    around those candidates and around faces seen in recent passes. Boxes
+    are returned in full-resolution coordinates.
+    """
+
+    def __init__(self, face_cascade, downscale=DEFAULT_DOWNSCALE, min_face=DEFAULT_MIN_FACE,
+                 roi_margin=DEFAULT_ROI_MARGIN, scale_factor=1.1, min_neighbors=5):
+        self.face_cascade = face_cascade
+        self.downscale = float(downscale)
+        self.min_face = int(min_face)
+        self.roi_margin = float(roi_margin)
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.recent = []  # [(x, y, w, h), passes_left]
+
+    def detect(self, gray):
+        height, width = gray.shape[:2]
+        small = cv2.resize(gray, None, fx=self.downscale, fy=self.downscale, interpolation=cv2.INTER_AREA)
+        small_min = max(8, int(self.min_face * self.downscale))
+        coarse = [
+            tuple(int(v / self.downscale) for v in box)
+            for box in self.face_cascade.detectMultiScale(
+                small, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+                minSize=(small_min, small_min))
+        ]
+
+        rois = []
+        for (x, y, w, h) in coarse + [box for box, _ in self.recent]:
+            mx, my = int(w * self.roi_margin), int(h * self.roi_margin)
+            rois.append((max(0, x - mx), max(0, y - my), min(width, x + w + mx), min(height, y + h + my)))
+
+        refined = []
+        for (x0, y0, x1, y1) in _merge_rois(rois):
+            if x1 - x0 < self.min_face or y1 - y0 < self.min_face:
+                continue
+            for (x, y, w, h) in self.face_cascade.detectMultiScale(
+                    gray[y0:y1, x0:x1], scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+                    minSize=(self.min_face, self.min_face)):
+                refined.append((int(x + x0), int(y + y0), int(w), int(h)))
+
+        # keep coarse hits the refinement missed rather than lose a face
+        faces = refined + [c for c in coarse if all(box_iou(c, r) < 0.3 for r in refined)]
+
+        kept = [(box, passes - 1) for box, passes in self.recent
+                if passes > 1 and all(box_iou(box, f) < 0.3 for f in faces)]
+        self.recent = [(f, ROI_MEMORY) for f in faces] + kept
+        return np.array(faces, dtype=np.int32).reshape(-1, 4)
+
+
+def make_detector(face_cascade, settings):
+    """MultiResolutionDetector when detection_mode is "multires", else None (plain full-frame pass)."""
+    if settings.get("detection_mode") != "multires":
+        return None
+    return MultiResolutionDetector(
+        face_cascade,
+        downscale=settings.get("detect_downscale", DEFAULT_DOWNSCALE),
+        min_face=settings.get("detect_min_face", DEFAULT_MIN_FACE),
+        roi_margin=settings.get("detect_roi_margin", DEFAULT_ROI_MARGIN),
+    )
@@ -0,0 +1,138 @@
+import cv2
+import numpy as np
+
+# templates are compared at this size; 1024-d keeps a 10k-face gallery at ~40 MB
+VECTOR_SIZE = (32, 32)
+MATCH_THRESHOLD = 0.6
+
+
+def face_vectors(crops):
+    """
+    Stack grayscale face crops into an (N, D) float32 matrix of zero-mean,
+    unit-norm rows, so a dot product between two rows is their normalized
+    cross-correlation.
+    """
+    if not crops:
+        return np.empty((0, VECTOR_SIZE[0] * VECTOR_SIZE[1]), dtype=np.float32)
+    vecs = np.stack([
+        cv2.resize(c, VECTOR_SIZE, interpolation=cv2.INTER_AREA).ravel() for c in crops
+    ]).astype(np.float32)
+    vecs -= vecs.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    vecs /= np.maximum(norms, 1e-6)
+    return vecs
+
+
+class FaceGallery:
+    """
+    All known-face templates held as one contiguous matrix, grouped by label,
+    so every detection in a frame is scored against every identity with a
+    single matrix product.
+
+    This is the app's own matcher (normalized cross-correlation of 32x32
+    grayscale templates, accepted at match_threshold) and it replaces
+    recognize_juliana_2_6_25.recognize_faces_in_frame, whose encodings are
+    opaque to this code and could not be batched. Who gets recognized can
+    therefore differ from the original module; `benchmark.py
+    --compare-legacy` measures the agreement.
+    """
+
+    def __init__(self, known_faces):
+        known_faces = sorted(known_faces, key=lambda item: item[0])
+        labels = [label for label, _ in known_faces]
+        self.matrix = np.ascontiguousarray(face_vectors([face for _, face in known_faces]))
+        self.labels = np.array(labels, dtype=object)
+        self.identities, self._starts = np.unique(self.labels.astype(str), return_index=True)
+        self.identities = self.identities.astype(object)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def match(self, vectors, top_k=1):
+        """
+        Score (N, D) query vectors against the gallery.
+        Returns (labels, scores), each shaped (N, k), best match first, where
+        an identity's score is its best-matching template.
+        """
+        n = len(vectors)
+        if n == 0 or len(self.labels) == 0:
+            return np.empty((n, 0), dtype=object), np.empty((n, 0), dtype=np.float32)
+
+        sims = vectors @ self.matrix.T
+        per_identity = np.maximum.reduceat(sims, self._starts, axis=1)
+
+        k = min(top_k, per_identity.shape[1])
+        top = np.argpartition(-per_identity, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(per_identity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return self.identities[top], np.take_along_axis(top_scores, order, axis=1)
+
+
+def recognize_faces_batch(gray, face_cascade, gallery, threshold=MATCH_THRESHOLD, detector=None, identities=None):
+    """
+    Detect faces in `gray` and label them all in one batched gallery lookup.
+    `detector` (e.g. MultiResolutionDetector) replaces the plain full-frame
+    cascade pass when given. With an IdentityCache, faces that continue a
+    known track reuse its cached label and only the rest are looked up.
+    Returns ([(x, y, w, h, label, score), ...], unknown_count), the same shape
+    recognize_faces_in_frame produced.
+    """
+    if detector is not None:
+        faces = detector.detect(gray)
+    else:
+        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
+    if identities is not None:
+        tracks = identities.associate(faces)
+        if len(faces) == 0:
+            return [], 0
+        stale = [i for i, track in enumerate(tracks) if identities.needs_recognition(track)]
+        identities.reused += len(faces) - len(stale)
+        if stale:
+            labels, scores = _match_crops(gray, [faces[i] for i in stale], gallery, threshold)
+            for i, label, score in zip(stale, labels, scores):
+                identities.store(tracks[i], label, score)
+        detections = [(int(x), int(y), int(w), int(h), t.label, t.score)
+                      for (x, y, w, h), t in zip(faces, tracks)]
+        return detections, sum(1 for t in tracks if t.label == "Unknown")
+
+    if len(faces) == 0:
+        return [], 0
+
+    labels, scores = _match_crops(gray, faces, gallery, threshold)
+    detections = []
+    unknown_count = 0
+    for (x, y, w, h), label, score in zip(faces, labels, scores):
+        if label == "Unknown":
+            unknown_count += 1
+        detections.append((int(x), int(y), int(w), int(h), label, score))
+    return detections, unknown_count
+
+
+def _match_crops(gray, faces, gallery, threshold):
+    """Best label per box ("Unknown" below `threshold`) and its score, from one gallery query."""
+    crops = [gray[y:y + h, x:x + w] for (x, y, w, h) in faces]
+    labels, scores = gallery.match(face_vectors(crops), top_k=1)
+    results_labels, results_scores = [], []
+    for i in range(len(faces)):
+        score = float(scores[i, 0]) if scores.shape[1] else 0.0
+        results_labels.append(labels[i, 0] if score >= threshold else "Unknown")
+        results_scores.append(score)
+    return results_labels, results_scores
+
+
+def recognize_or_track(gray, face_cascade, gallery, tracker=None, threshold=MATCH_THRESHOLD, detector=None,
+                       identities=None):
+    """
+    Run the full cascade + gallery pass when there is no tracker or it asks
+    for a re-detection; otherwise just move the tracked boxes onto `gray`.
+    """
+    if tracker is None or tracker.needs_detection():
+        detections, unknown_count = recognize_faces_batch(gray, face_cascade, gallery, threshold, detector,
+                                                          identities)
+        if tracker is not None:
+            tracker.reset(gray, detections)
+        return detections, unknown_count
+
+    detections = tracker.update(gray)
+    return detections, sum(1 for d in detections if d[4] == "Unknown")
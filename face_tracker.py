@@ -0,0 +1,94 @@
+import cv2
+import numpy as np
+
+LK_PARAMS = dict(
+    winSize=(15, 15),
+    maxLevel=2,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+)
+
+# forward/backward disagreement (pixels) above which a tracked point is discarded
+MAX_FB_ERROR = 1.0
+MIN_TRACK_POINTS = 4
+
+
+class FaceTracker:
+    """
+    Moves face boxes between full cascade passes with pyramidal Lucas-Kanade
+    optical flow. A full detection is requested every `detect_every_n` frames,
+    or earlier when the fraction of points that survive tracking drops below
+    `redetect_confidence`. A face with too little texture to track (small,
+    blurred, flat) is kept as a static box until the next detection pass
+    rather than dropped.
+    """
+
+    def __init__(self, detect_every_n=5, redetect_confidence=0.5, max_points=20):
+        self.detect_every_n = max(1, int(detect_every_n))
+        self.redetect_confidence = float(redetect_confidence)
+        self.max_points = max_points
+        self.prev_gray = None
+        self.tracks = []
+        self.frames_since_detect = 0
+        self.confidence = 0.0
+
+    def needs_detection(self):
+        return (
+            self.prev_gray is None
+            or self.frames_since_detect >= self.detect_every_n - 1
+            or self.confidence < self.redetect_confidence
+        )
+
+    def reset(self, gray, detections):
+        """Start tracking the boxes from a fresh detection pass."""
+        self.prev_gray = gray
+        self.frames_since_detect = 0
+        self.confidence = 1.0
+        self.tracks = []
+        for (x, y, w, h, label, score) in detections:
+            # points is None for a static box
+            self.tracks.append([float(x), float(y), w, h, label, score, self._seed_points(gray, x, y, w, h)])
+
+    def update(self, gray):
+        """Shift every tracked box onto `gray` and return the moved detections."""
+        self.frames_since_detect += 1
+        moving = [t for t in self.tracks if t[6] is not None]
+        if not moving:
+            self.prev_gray = gray
+            return [(int(t[0]), int(t[1]), t[2], t[3], t[4], t[5]) for t in self.tracks]
+
+        counts = [len(t[6]) for t in moving]
+        old = np.concatenate([t[6] for t in moving])
+        new, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, old, None, **LK_PARAMS)
+        back, status_back, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, new, None, **LK_PARAMS)
+        fb_error = np.linalg.norm((old - back).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (status_back.ravel() == 1) & (fb_error < MAX_FB_ERROR)
+
+        height, width = gray.shape[:2]
+        lost, ratios = set(), []
+        start = 0
+        for track, n in zip(moving, counts):
+            mask = good[start:start + n]
+            ratios.append(mask.mean())
+            if mask.sum() >= MIN_TRACK_POINTS:
+                shift = np.median((new[start:start + n] - old[start:start + n])[mask].reshape(-1, 2), axis=0)
+                track[0] = min(max(track[0] + shift[0], 0), width - track[2])
+                track[1] = min(max(track[1] + shift[1], 0), height - track[3])
+                track[6] = new[start:start + n][mask].reshape(-1, 1, 2)
+            else:
+                lost.add(id(track))
+            start += n
+
+        self.tracks = [t for t in self.tracks if id(t) not in lost]
+        self.confidence = min(ratios)
+        self.prev_gray = gray
+        return [(int(t[0]), int(t[1]), t[2], t[3], t[4], t[5]) for t in self.tracks]
+
+    def _seed_points(self, gray, x, y, w, h):
+        mask = np.zeros_like(gray)
+        # stay inside the face so background texture doesn't drag the box
+        mx, my = w // 5, h // 5
+        mask[y + my:y + h - my, x + mx:x + w - mx] = 255
+        points = cv2.goodFeaturesToTrack(gray, self.max_points, 0.01, 3, mask=mask)
+        if points is None or len(points) < MIN_TRACK_POINTS:
+            return None
+        return points.astype(np.float32)
@@ -0,0 +1,205 @@
+"""
+Kinematic flight simulation for planned routes.
+
+A FlightProfile (cruise speed, acceleration, turn-rate limit, map scale)
+turns a list of canvas waypoints into a time-stamped Trajectory once; the
+route planner then plays it back by sampling at wall-clock time (times a
+playback factor), so the simulated speed no longer depends on Tk timer
+jitter. Works headless too:
+
+    python flight_sim.py route.json                    # flight time and per-leg ETAs
+    python flight_sim.py routes/*.json --speed 15 --json
+"""
+import argparse
+import json
+import math
+
+import numpy as np
+
+DEFAULT_CRUISE_SPEED = 10.0      # m/s
+DEFAULT_ACCELERATION = 2.0       # m/s^2, used for both speeding up and braking
+DEFAULT_TURN_RATE = 90.0         # deg/s
+DEFAULT_PIXELS_PER_METRE = 2.0   # canvas scale
+DEFAULT_PLAYBACK_SPEED = 1.0     # 1 = real time
+_EPS = 1e-9
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m {seconds:02d}s"
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"
+
+
+class Trajectory:
+    """
+    Time-stamped flight along a polyline. Each leg is a trapezoidal speed
+    profile (accelerate, cruise, brake) between its entry and exit speeds;
+    sample() evaluates any number of times at once.
+    """
+
+    def __init__(self, points, entry, peak, exit_, ppm, acceleration):
+        self.points = points                      # (n, 2) canvas px
+        self.ppm = ppm
+        self.acceleration = acceleration
+        delta = np.diff(points, axis=0)
+        self.lengths = np.hypot(delta[:, 0], delta[:, 1]) / ppm   # metres
+        self.directions = delta / np.maximum(self.lengths * ppm, _EPS)[:, None]
+        self.headings = np.degrees(np.arctan2(-delta[:, 1], delta[:, 0]))
+        self.entry, self.peak, self.exit = entry, peak, exit_
+
+        a = acceleration
+        self.accel_time = (peak - entry) / a
+        self.brake_time = (peak - exit_) / a
+        self.accel_dist = (peak ** 2 - entry ** 2) / (2 * a)
+        brake_dist = (peak ** 2 - exit_ ** 2) / (2 * a)
+        cruise_dist = np.maximum(self.lengths - self.accel_dist - brake_dist, 0.0)
+        self.cruise_time = np.divide(cruise_dist, peak, out=np.zeros_like(peak), where=peak > _EPS)
+        self.leg_times = self.accel_time + self.cruise_time + self.brake_time
+        self.times = np.concatenate([[0.0], np.cumsum(self.leg_times)])  # arrival at each waypoint
+
+    @property
+    def duration(self):
+        return float(self.times[-1])
+
+    @property
+    def distance(self):
+        return float(self.lengths.sum())
+
+    def etas(self):
+        """Arrival time in seconds at every waypoint after the first."""
+        return self.times[1:].tolist()
+
+    def leg_index(self, t):
+        """Index of the leg being flown at time(s) `t`."""
+        return np.clip(np.searchsorted(self.times, t, side="right") - 1, 0, len(self.lengths) - 1)
+
+    def sample(self, t):
+        """Positions (canvas px), headings (deg, 0 = east) and speeds (m/s) at time(s) `t`."""
+        t = np.clip(np.asarray(t, dtype=np.float64), 0.0, self.duration)
+        leg = self.leg_index(t)
+        tau = t - self.times[leg]
+        a = self.acceleration
+        v0, vp = self.entry[leg], self.peak[leg]
+        t1, t2 = self.accel_time[leg], self.cruise_time[leg]
+        d1 = self.accel_dist[leg]
+
+        t3 = np.clip(tau - t1 - t2, 0.0, self.brake_time[leg])
+        s = np.where(
+            tau < t1,
+            v0 * tau + 0.5 * a * tau ** 2,
+            np.where(tau < t1 + t2, d1 + vp * (tau - t1), d1 + vp * t2 + vp * t3 - 0.5 * a * t3 ** 2),
+        )
+        speed = np.where(tau < t1, v0 + a * tau, np.where(tau < t1 + t2, vp, vp - a * t3))
+        s = np.minimum(s, self.lengths[leg]) * self.ppm
+        xy = self.points[leg] + self.directions[leg] * s[..., None]
+        return xy, self.headings[leg], speed
+
+    def summary(self):
+        return {
+            "waypoints": len(self.points),
+            "distance_m": round(self.distance, 1),
+            "flight_time_s": round(self.duration, 2),
+            "leg_eta_s": [round(eta, 2) for eta in self.etas()],
+        }
+
+
+class FlightProfile:
+    """
+    Multirotor limits for the route simulator. Corners are flown at the
+    speed that lets the turn-rate limit round them within half of the
+    shorter adjacent leg (r = v / turn_rate); the drone starts and ends
+    at a hover.
+    """
+
+    def __init__(self, cruise_speed=DEFAULT_CRUISE_SPEED, acceleration=DEFAULT_ACCELERATION,
+                 turn_rate=DEFAULT_TURN_RATE, pixels_per_metre=DEFAULT_PIXELS_PER_METRE):
+        self.cruise_speed = float(cruise_speed)
+        self.acceleration = float(acceleration)
+        self.turn_rate = math.radians(float(turn_rate))
+        self.pixels_per_metre = float(pixels_per_metre)
+        if min(self.cruise_speed, self.acceleration, self.turn_rate, self.pixels_per_metre) <= 0:
+            raise ValueError("speed, acceleration, turn rate and scale must all be positive")
+
+    def plan(self, points, closed=False):
+        """Trajectory through `points` (back to the start when `closed`); None if it has no length."""
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if closed and len(pts) > 1:
+            pts = np.vstack([pts, pts[:1]])
+        if len(pts) > 1:
+            keep = np.concatenate([[True], np.hypot(*np.diff(pts, axis=0).T) > _EPS])
+            pts = pts[keep]
+        if len(pts) < 2:
+            return None
+
+        delta = np.diff(pts, axis=0)
+        lengths = np.hypot(delta[:, 0], delta[:, 1]) / self.pixels_per_metre
+        cruise, a = self.cruise_speed, self.acceleration
+
+        # speed allowed at each waypoint: hover at both ends, corners limited by the turn rate
+        limit = np.zeros(len(pts))
+        if len(pts) > 2:
+            heading = np.arctan2(delta[:, 1], delta[:, 0])
+            turn = np.abs((np.diff(heading) + np.pi) % (2 * np.pi) - np.pi)
+            room = 0.5 * np.minimum(lengths[:-1], lengths[1:])
+            half = np.tan(np.minimum(turn, np.pi - 1e-6) / 2)
+            corner = np.divide(self.turn_rate * room, half, out=np.full_like(half, np.inf), where=half > _EPS)
+            limit[1:-1] = np.minimum(corner, cruise)
+
+        # reachable speeds: v[i]^2 <= v[i-1]^2 + 2 a L, as a running minimum of (v^2 - 2 a s)
+        reach = 2 * a * np.concatenate([[0.0], np.cumsum(lengths)])
+        # and the same backwards so every leg can brake in time
+        back = reach[-1] - reach
+        v2 = np.minimum(np.minimum.accumulate(limit ** 2 - reach) + reach,
+                        np.minimum.accumulate((limit ** 2 - back)[::-1])[::-1] + back)
+        v = np.sqrt(np.maximum(v2, 0.0))
+
+        entry, exit_ = v[:-1], v[1:]
+        peak = np.sqrt(np.minimum(cruise ** 2, a * lengths + 0.5 * (entry ** 2 + exit_ ** 2)))
+        peak = np.maximum(peak, np.maximum(entry, exit_))
+        return Trajectory(pts, entry, peak, exit_, self.pixels_per_metre, a)
+
+
+def make_flight_profile(settings):
+    return FlightProfile(
+        cruise_speed=settings.get("sim_cruise_speed", DEFAULT_CRUISE_SPEED),
+        acceleration=settings.get("sim_acceleration", DEFAULT_ACCELERATION),
+        turn_rate=settings.get("sim_turn_rate", DEFAULT_TURN_RATE),
+        pixels_per_metre=settings.get("sim_pixels_per_metre", DEFAULT_PIXELS_PER_METRE),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate flight time and per-leg ETAs of saved routes.")
+    parser.add_argument("routes", nargs="+", help="route JSON files ([[x, y], ...])")
+    parser.add_argument("--speed", type=float, default=DEFAULT_CRUISE_SPEED, help="cruise speed, m/s")
+    parser.add_argument("--accel", type=float, default=DEFAULT_ACCELERATION, help="acceleration, m/s^2")
+    parser.add_argument("--turn-rate", type=float, default=DEFAULT_TURN_RATE, help="turn-rate limit, deg/s")
+    parser.add_argument("--ppm", type=float, default=DEFAULT_PIXELS_PER_METRE, help="canvas pixels per metre")
+    parser.add_argument("--loop", action="store_true", help="fly back to the first waypoint")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per route")
+    args = parser.parse_args(argv)
+
+    profile = FlightProfile(args.speed, args.accel, args.turn_rate, args.ppm)
+    for path in args.routes:
+        with open(path) as f:
+            trajectory = profile.plan(json.load(f), closed=args.loop)
+        if trajectory is None:
+            print(f"{path}: route has fewer than two distinct waypoints")
+            continue
+        summary = trajectory.summary()
+        if args.json:
+            print(json.dumps(dict(summary, route=path)))
+            continue
+        print(f"{path}: {summary['waypoints']} waypoints, {summary['distance_m']:.0f} m, "
+              f"{format_duration(trajectory.duration)}")
+        for i, eta in enumerate(summary["leg_eta_s"], start=1):
+            print(f"  leg {i:3d}  ETA {eta:8.1f} s")
+
+
+if __name__ == "__main__":
+    main()
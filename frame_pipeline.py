@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class FramePacket:
+    """One captured frame on its way through capture -> detect -> annotate."""
+
+    def __init__(self, seq, image):
+        self.seq = seq
+        self.captured_at = time.perf_counter()
+        self.timestamp = datetime.now()
+        self.image = image
+        self.gray = None
+        self.detections = []
+        self.unknown_count = 0
+        self.appearances = None
+
+    def age(self):
+        """Seconds since the frame left the camera."""
+        return time.perf_counter() - self.captured_at
+
+
+class LatestQueue:
+    """
+    Bounded hand-off queue between stages.
+    When full, put() discards the oldest item so a slow consumer always
+    sees the newest frame instead of working through a backlog.
+    """
+
+    def __init__(self, maxsize=1):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the oldest queued item, or None if nothing arrived within timeout."""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+    def clear(self):
+        with self._cond:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class PipelineStage(threading.Thread):
+    """
+    Worker thread that pulls items from `inbox`, runs `work` on them and
+    pushes non-None results to `outbox`. Exits once `stop_event` is set.
+    """
+
+    def __init__(self, name, work, inbox, outbox, stop_event, poll=0.1):
+        super().__init__(name=name, daemon=True)
+        self.work = work
+        self.inbox = inbox
+        self.outbox = outbox
+        self.stop_event = stop_event
+        self.poll = poll
+        self.processed = 0
+
+    def run(self):
+        while not self.stop_event.is_set():
+            item = self.inbox.get(timeout=self.poll)
+            if item is None:
+                continue
+            result = self.work(item)
+            self.processed += 1
+            if result is not None and self.outbox is not None:
+                self.outbox.put(result)
+
+
+class LatencyStats:
+    """Rolling window of end-to-end frame latencies (seconds)."""
+
+    def __init__(self, window=300):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def summary(self):
+        """Return mean/p50/p95/max in milliseconds over the current window."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+
+        def pct(p):
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+
+        return {
+            "frames": self.count,
+            "mean_ms": sum(samples) / len(samples) * 1000,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": samples[-1] * 1000,
+        }
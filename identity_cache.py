@@ -0,0 +1,148 @@
+import time
+
+from face_detector import box_iou
+
+DEFAULT_REFRESH = 2.0           # seconds a cached label is trusted before re-checking
+DEFAULT_UNCERTAIN_MARGIN = 0.05  # scores this close to the threshold are re-checked every pass
+DEFAULT_IOU = 0.3
+MAX_MISSED = 5                  # detection passes a track survives without a matching box
+CENTROID_FACTOR = 0.5           # fallback match: centres closer than this fraction of the box size
+LABEL_CONFIRMATIONS = 3         # consecutive checks a new label must hold before it counts as an appearance
+
+
+class IdentityTrack:
+    __slots__ = ("track_id", "box", "label", "score", "checked_at", "missed", "counted", "pending", "streak")
+
+    def __init__(self, track_id, box):
+        self.track_id = track_id
+        self.box = box
+        self.label = None
+        self.score = 0.0
+        self.checked_at = None
+        self.missed = 0
+        self.counted = None   # label last counted as an appearance
+        self.pending = None   # label waiting for confirmation, and how many checks in a row it held
+        self.streak = 0
+
+
+class IdentityCache:
+    """
+    Follows faces across detection passes (IoU, then centroid distance) and
+    remembers each track's label and score, so the gallery is only queried
+    for new tracks, tracks whose label is older than `refresh` seconds, or
+    tracks whose last score sat within `uncertain_margin` of the threshold.
+
+    A track's first label counts as one appearance once it is confident
+    (outside the uncertain margin) or has held for LABEL_CONFIRMATIONS
+    checks; a later change of label needs the same confirmation, so a face
+    flickering around the threshold is not counted again on every flip.
+    pop_appearances() hands the appearances out for the session counters.
+    """
+
+    def __init__(self, threshold, refresh=DEFAULT_REFRESH, uncertain_margin=DEFAULT_UNCERTAIN_MARGIN,
+                 iou_threshold=DEFAULT_IOU, max_missed=MAX_MISSED):
+        self.threshold = threshold
+        self.refresh = float(refresh)
+        self.uncertain_margin = float(uncertain_margin)
+        self.iou_threshold = float(iou_threshold)
+        self.max_missed = int(max_missed)
+        self.tracks = []
+        self.created = 0
+        self._appearances = []
+        self.recognized = 0
+        self.reused = 0
+
+    def associate(self, boxes):
+        """Return one IdentityTrack per (x, y, w, h) box, creating tracks for unmatched boxes."""
+        boxes = [tuple(int(v) for v in box) for box in boxes]
+        pairs = sorted(
+            ((box_iou(t.box, b), ti, bi) for ti, t in enumerate(self.tracks) for bi, b in enumerate(boxes)),
+            reverse=True,
+        )
+        assigned = {}
+        used = set()
+        for iou, ti, bi in pairs:
+            if iou < self.iou_threshold:
+                break
+            if ti not in used and bi not in assigned:
+                assigned[bi] = ti
+                used.add(ti)
+
+        for bi, box in enumerate(boxes):
+            if bi in assigned:
+                continue
+            best, best_dist = None, None
+            for ti, t in enumerate(self.tracks):
+                if ti in used:
+                    continue
+                dist = _centre_distance(t.box, box)
+                if dist < CENTROID_FACTOR * max(box[2], box[3]) and (best is None or dist < best_dist):
+                    best, best_dist = ti, dist
+            if best is not None:
+                assigned[bi] = best
+                used.add(best)
+
+        matched = []
+        for bi, box in enumerate(boxes):
+            if bi in assigned:
+                track = self.tracks[assigned[bi]]
+                track.box = box
+                track.missed = 0
+            else:
+                track = IdentityTrack(self.created, box)
+                self.created += 1
+            matched.append(track)
+
+        unmatched = [t for ti, t in enumerate(self.tracks) if ti not in used]
+        for t in unmatched:
+            t.missed += 1
+        self.tracks = matched + [t for t in unmatched if t.missed <= self.max_missed]
+        return matched
+
+    def needs_recognition(self, track, now=None):
+        now = time.monotonic() if now is None else now
+        return (
+            track.label is None
+            or now - track.checked_at >= self.refresh
+            or abs(track.score - self.threshold) < self.uncertain_margin
+        )
+
+    def store(self, track, label, score, now=None):
+        if label == track.counted:
+            track.pending, track.streak = None, 0
+        else:
+            if label == track.pending:
+                track.streak += 1
+            else:
+                track.pending, track.streak = label, 1
+            confident = abs(score - self.threshold) >= self.uncertain_margin
+            if (track.counted is None and confident) or track.streak >= LABEL_CONFIRMATIONS:
+                self._appearances.append(label)
+                track.counted = label
+                track.pending, track.streak = None, 0
+        track.label = label
+        track.score = score
+        track.checked_at = time.monotonic() if now is None else now
+        self.recognized += 1
+
+    def pop_appearances(self):
+        appearances, self._appearances = self._appearances, []
+        return appearances
+
+    def stats(self):
+        return {"tracks": self.created, "recognized": self.recognized, "reused": self.reused}
+
+
+def _centre_distance(a, b):
+    return (((a[0] + a[2] / 2) - (b[0] + b[2] / 2)) ** 2 + ((a[1] + a[3] / 2) - (b[1] + b[3] / 2)) ** 2) ** 0.5
+
+
+def make_identity_cache(settings):
+    """IdentityCache when identity_cache_enabled is set, else None (recognize every face every pass)."""
+    if not settings.get("identity_cache_enabled"):
+        return None
+    return IdentityCache(
+        settings["match_threshold"],
+        refresh=settings.get("identity_refresh", DEFAULT_REFRESH),
+        uncertain_margin=settings.get("identity_uncertain_margin", DEFAULT_UNCERTAIN_MARGIN),
+    )
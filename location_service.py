@@ -0,0 +1,160 @@
+import threading
+import time
+
+from stage_metrics import NULL_METRICS
+
+UNKNOWN_LOCATION = ["Unknown", "Unknown"]
+
+DEFAULT_TTL = 30.0    # seconds a good fix is trusted before refreshing
+RETRY_INTERVAL = 5.0  # seconds between attempts while there is no fix
+
+
+class IPLocationBackend:
+    """Coarse fix from the public IP address (needs network access)."""
+
+    name = "ip"
+
+    def fetch(self):
+        import geocoder
+        location = geocoder.ip('me')
+        return list(location.latlng) if location.ok and location.latlng else None
+
+
+class FixedLocationBackend:
+    """Always reports the coordinate given in the settings."""
+
+    name = "fixed"
+
+    def __init__(self, lat, lon):
+        self.coords = [float(lat), float(lon)]
+
+    def fetch(self):
+        return list(self.coords)
+
+
+def _nmea_degrees(value, hemisphere):
+    # NMEA packs degrees and minutes: ddmm.mmmm / dddmm.mmmm
+    if not value:
+        return None
+    dot = value.index(".") if "." in value else len(value)
+    degrees = float(value[:dot - 2]) + float(value[dot - 2:]) / 60.0
+    return -degrees if hemisphere in ("S", "W") else degrees
+
+
+def parse_nmea_line(line):
+    """Return [lat, lon] for a valid GGA/RMC sentence, else None."""
+    line = line.strip()
+    if not line.startswith("$"):
+        return None
+    fields = line.split("*")[0].split(",")
+    kind = fields[0][-3:]
+    try:
+        if kind == "GGA" and len(fields) > 6 and fields[6] not in ("", "0"):
+            lat, lon = _nmea_degrees(fields[2], fields[3]), _nmea_degrees(fields[4], fields[5])
+        elif kind == "RMC" and len(fields) > 6 and fields[2] == "A":
+            lat, lon = _nmea_degrees(fields[3], fields[4]), _nmea_degrees(fields[5], fields[6])
+        else:
+            return None
+    except ValueError:
+        return None
+    if lat is None or lon is None:
+        return None
+    return [round(lat, 6), round(lon, 6)]
+
+
+class NMEAReplayBackend:
+    """Replays fixes from a recorded NMEA/GPS log, one per refresh, looping at the end."""
+
+    name = "nmea"
+
+    def __init__(self, path, loop=True):
+        with open(path, "r", errors="ignore") as f:
+            self.fixes = [fix for fix in (parse_nmea_line(line) for line in f) if fix]
+        self.loop = loop
+        self._index = 0
+
+    def fetch(self):
+        if not self.fixes:
+            return None
+        if self._index >= len(self.fixes):
+            if not self.loop:
+                return list(self.fixes[-1])
+            self._index = 0
+        fix = self.fixes[self._index]
+        self._index += 1
+        return list(fix)
+
+
+def make_location_backend(settings):
+    """
+    Build the backend selected by `location_backend` in gui_settings.json.
+    A missing or invalid fixed coordinate or NMEA log is reported and falls
+    back to the IP lookup, so a bad setting never stops a session starting.
+    """
+    kind = settings.get("location_backend", "ip")
+    try:
+        if kind == "fixed":
+            fixed = settings.get("location_fixed")
+            if not fixed or len(fixed) != 2:
+                raise ValueError(f"location_fixed must be [lat, lon], got {fixed!r}")
+            return FixedLocationBackend(*fixed)
+        if kind == "nmea":
+            path = settings.get("location_nmea_file")
+            if not path:
+                raise ValueError("location_nmea_file is not set")
+            return NMEAReplayBackend(path)
+        if kind != "ip":
+            raise ValueError(f"unknown location_backend {kind!r}")
+    except (TypeError, ValueError, OSError) as e:
+        print(f"Location backend unavailable, using IP lookup instead: {e}")
+    return IPLocationBackend()
+
+
+class LocationService:
+    """
+    Refreshes the position on a background thread so callers on the capture
+    path only ever read the last known fix and never wait on the network.
+    """
+
+    def __init__(self, backend, ttl=DEFAULT_TTL, retry=RETRY_INTERVAL, metrics=NULL_METRICS):
+        self.backend = backend
+        self.metrics = metrics
+        self.ttl = ttl
+        self.retry = retry
+        self._lock = threading.Lock()
+        self._coords = None
+        self._fix_time = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="location", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def current(self):
+        """Last known [lat, lon], or UNKNOWN_LOCATION if there has never been a fix."""
+        with self._lock:
+            return list(self._coords) if self._coords else list(UNKNOWN_LOCATION)
+
+    def fix_age(self):
+        """Seconds since the last good fix, or None."""
+        with self._lock:
+            return None if self._fix_time is None else time.time() - self._fix_time
+
+    def _run(self):
+        while not self._stop.is_set():
+            timer = self.metrics.timer()
+            try:
+                coords = self.backend.fetch()
+                timer.lap(f"location.{self.backend.name}")
+            except Exception as e:
+                print(f"Location lookup failed ({self.backend.name}): {e}")
+                coords = None
+            if coords:
+                with self._lock:
+                    self._coords = coords
+                    self._fix_time = time.time()
+            self._stop.wait(self.ttl if coords else self.retry)
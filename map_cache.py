@@ -0,0 +1,96 @@
+import os
+import threading
+import urllib.request
+
+MAP_CACHE_DIR = "map_cache"
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+COORD_PRECISION = 4  # ~11 m; nearby fixes share one cached tile
+MAPBOX_TOKEN = "pk.eyJ1IjoianVsaWFuYTItNCIsImEiOiJjbWJ1dmN0cjUwOXc2MmxteHFjYzd5Z3R4In0.nviVNGXAt_oYWn3pRClM9Q"
+
+
+def mapbox_static_url(lat, lon, zoom, size):
+    width, height = size
+    return (
+        f"https://api.mapbox.com/styles/v1/mapbox/streets-v11/static/"
+        f"pin-l+00ff00({lon},{lat})/{lon},{lat},{zoom},0/{width}x{height}"
+        f"?access_token={MAPBOX_TOKEN}"
+    )
+
+
+def urlopen_fetch(url, timeout=10):
+    return urllib.request.urlopen(url, timeout=timeout).read()
+
+
+class MapImageCache:
+    """
+    On-disk cache of static map images keyed by rounded lat/lon, zoom and
+    size. Entries are evicted least-recently-used first once the folder
+    grows past `max_bytes`. `fetch(url) -> bytes` and `url_builder` can be
+    swapped out, e.g. to point at a local stand-in server.
+    """
+
+    def __init__(self, cache_dir=MAP_CACHE_DIR, max_bytes=MAX_CACHE_BYTES,
+                 fetch=urlopen_fetch, url_builder=mapbox_static_url):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fetch = fetch
+        self.url_builder = url_builder
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, lat, lon, zoom, size):
+        lat, lon = round(float(lat), COORD_PRECISION), round(float(lon), COORD_PRECISION)
+        name = f"{lat:.{COORD_PRECISION}f}_{lon:.{COORD_PRECISION}f}_z{zoom}_{size[0]}x{size[1]}.img"
+        return os.path.join(self.cache_dir, name)
+
+    def cached(self, lat, lon, zoom=14, size=(400, 300)):
+        """Return the cached image bytes without touching the network, or None."""
+        path = self.path_for(lat, lon, zoom, size)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        os.utime(path)  # mark as recently used
+        return data
+
+    def get(self, lat, lon, zoom=14, size=(400, 300)):
+        """Return image bytes, fetching and storing them on a cache miss."""
+        data = self.cached(lat, lon, zoom, size)
+        if data is not None:
+            return data
+
+        lat, lon = round(float(lat), COORD_PRECISION), round(float(lon), COORD_PRECISION)
+        data = self.fetch(self.url_builder(lat, lon, zoom, size))
+        path = self.path_for(lat, lon, zoom, size)
+        with self._lock:
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._evict()
+        return data
+
+    def get_async(self, lat, lon, callback, zoom=14, size=(400, 300)):
+        """Fetch on a worker thread and call callback(data, error) from that thread."""
+        def work():
+            try:
+                callback(self.get(lat, lon, zoom, size), None)
+            except Exception as e:
+                callback(None, e)
+
+        threading.Thread(target=work, name="map-fetch", daemon=True).start()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".img"):
+                continue
+            st = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
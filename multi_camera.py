@@ -0,0 +1,222 @@
+import math
+import multiprocessing as mp
+import queue
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from annotation import SNAPSHOT_INTERVAL, draw_detections, snapshot_targets
+from face_detector import make_detector
+from identity_cache import make_identity_cache
+from face_gallery import FaceGallery, recognize_or_track
+from face_tracker import FaceTracker
+from frame_pipeline import LatencyStats
+from location_service import LocationService, make_location_backend
+from snapshot_writer import SnapshotWriter
+from snapshot_dedup import make_snapshot_deduper
+from clip_recorder import make_clip_recorder
+
+DISPLAY_SIZE = (640, 480)
+PREVIEW_JPEG_QUALITY = 80
+
+
+def parse_source(source):
+    """Device indices may come from JSON as ints or digit strings; anything else is a file/URL."""
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return int(source)
+    return source
+
+
+def camera_worker(stream_id, source, known_faces, settings, folders, frames_out, events_out, stop_event):
+    """
+    Runs in its own process: capture, detection/recognition, annotation and
+    snapshots for one stream. Detection events go to `events_out` (never
+    dropped); JPEG previews go to `frames_out` and are dropped when the GUI
+    falls behind.
+    """
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    gallery = FaceGallery(known_faces)
+    detector = make_detector(face_cascade, settings)
+    identities = make_identity_cache(settings)
+    tracker = None
+    if settings["tracking_enabled"]:
+        tracker = FaceTracker(settings["detect_every_n"], settings["redetect_confidence"])
+
+    source = parse_source(source)
+    live = isinstance(source, int)
+    cap = cv2.VideoCapture(source)
+    if live:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, DISPLAY_SIZE[0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, DISPLAY_SIZE[1])
+
+    location = LocationService(make_location_backend(settings), ttl=settings["location_ttl"]).start()
+    writer = SnapshotWriter(settings["snapshot_jpeg_quality"], settings["snapshot_queue_size"],
+                            dedup=make_snapshot_deduper(settings))
+    clips = make_clip_recorder(folders["clips"], settings)
+    seq = 0
+    dropped = 0
+    last_snapshot_time = datetime.min
+    try:
+        while not stop_event.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                if live:
+                    continue
+                break  # end of a recorded feed
+
+            captured_at = time.time()
+            if live:
+                frame = cv2.flip(frame, 1)
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            detections, _ = recognize_or_track(
+                gray, face_cascade, gallery, tracker, settings["match_threshold"], detector, identities
+            )
+            draw_detections(frame, detections)
+
+            now = datetime.now()
+            coords = None
+            snapshots = None
+            if (now - last_snapshot_time).total_seconds() >= SNAPSHOT_INTERVAL:
+                coords = location.current()
+                targets = snapshot_targets(detections, folders["known"], folders["unknown"])
+                snapshots = writer.submit(frame, targets, now, coords, [d[:4] for d in detections])
+                last_snapshot_time = now
+
+            if clips:
+                clips.push(frame, now)
+                known = [d[4] for d in detections if d[4] != "Unknown"]
+                if known:
+                    clips.trigger(known[0], now)
+
+            events_out.put({
+                "stream": stream_id, "seq": seq, "timestamp": now,
+                "detections": detections, "location": coords,
+                "position": coords or location.current(), "snapshots": snapshots,
+                "appearances": identities.pop_appearances() if identities else None,
+            })
+
+            ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, PREVIEW_JPEG_QUALITY])
+            if ok:
+                try:
+                    frames_out.put_nowait((stream_id, seq, captured_at, jpeg.tobytes(), dropped))
+                except queue.Full:
+                    dropped += 1
+            seq += 1
+    finally:
+        cap.release()
+        location.stop()
+        writer.close()
+        if clips:
+            clips.close()
+        events_out.put({"stream": stream_id, "finished": True, "snapshot_stats": writer.stats(),
+                        "clip_stats": clips.stats() if clips else None,
+                        "recognition_stats": identities.stats() if identities else None})
+
+
+class MultiCameraManager:
+    """
+    Starts one camera_worker process per stream and, on a background thread,
+    forwards their detection events and a tiled preview of all streams back
+    to the caller through `on_event` / `on_frame`. `on_finished` is called
+    once every worker has exited on its own (all recorded feeds ended).
+    """
+
+    def __init__(self, streams, known_faces, settings, on_event, on_frame, on_finished=None):
+        # streams: [(stream_id, source, {"known": dir, "unknown": dir}), ...]
+        self.streams = streams
+        self.known_faces = known_faces
+        self.settings = settings
+        self.on_event = on_event
+        self.on_frame = on_frame
+        self.on_finished = on_finished or (lambda: None)
+
+        ctx = mp.get_context("spawn")
+        self.stop_event = ctx.Event()
+        self.frames = ctx.Queue(maxsize=2 * len(streams))
+        self.events = ctx.Queue()
+        self.processes = [
+            ctx.Process(
+                target=camera_worker, daemon=True, name=f"camera-{stream_id}",
+                args=(stream_id, source, known_faces, settings, folders,
+                      self.frames, self.events, self.stop_event),
+            )
+            for stream_id, source, folders in streams
+        ]
+
+        self.latency = {stream_id: LatencyStats() for stream_id, _, _ in streams}
+        self.dropped = {stream_id: 0 for stream_id, _, _ in streams}
+        self.finished = set()
+        self.snapshot_stats = {}
+        self.clip_stats = {}
+        self.recognition_stats = {}
+        self.tiles = {}
+        self._running = False
+        self._drain_thread = None
+
+    def start(self):
+        self._running = True
+        for proc in self.processes:
+            proc.start()
+        self._drain_thread = threading.Thread(target=self._drain_loop, daemon=True)
+        self._drain_thread.start()
+
+    def stop(self, timeout=3.0):
+        self.stop_event.set()
+        deadline = time.time() + timeout
+        for proc in self.processes:
+            proc.join(max(0.0, deadline - time.time()))
+            if proc.is_alive():
+                proc.terminate()
+        self._running = False
+        if self._drain_thread is not None:
+            self._drain_thread.join(timeout=1.0)
+        # count whatever the workers managed to report before exiting
+        self._drain_events()
+
+    def _drain_events(self):
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                return
+            if event.get("finished"):
+                self.finished.add(event["stream"])
+                self.snapshot_stats[event["stream"]] = event["snapshot_stats"]
+                self.clip_stats[event["stream"]] = event["clip_stats"]
+                self.recognition_stats[event["stream"]] = event["recognition_stats"]
+                if self._running and len(self.finished) == len(self.streams):
+                    self.on_finished()
+            else:
+                self.on_event(event)
+
+    def _drain_loop(self):
+        while self._running:
+            self._drain_events()
+            try:
+                stream_id, seq, captured_at, jpeg, dropped = self.frames.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            self.latency[stream_id].add(time.time() - captured_at)
+            self.dropped[stream_id] = dropped
+            self.tiles[stream_id] = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+            self.on_frame(self.compose_mosaic())
+
+    def compose_mosaic(self):
+        """Tile the latest frame of every stream into one DISPLAY_SIZE image."""
+        n = len(self.streams)
+        cols = math.ceil(math.sqrt(n))
+        rows = math.ceil(n / cols)
+        tile_w, tile_h = DISPLAY_SIZE[0] // cols, DISPLAY_SIZE[1] // rows
+        mosaic = np.zeros((tile_h * rows, tile_w * cols, 3), dtype=np.uint8)
+        for i, (stream_id, _, _) in enumerate(self.streams):
+            tile = self.tiles.get(stream_id)
+            if tile is None:
+                continue
+            r, c = divmod(i, cols)
+            mosaic[r * tile_h:(r + 1) * tile_h, c * tile_w:(c + 1) * tile_w] = cv2.resize(tile, (tile_w, tile_h))
+            cv2.putText(mosaic, f"cam {stream_id}", (c * tile_w + 8, r * tile_h + 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        return mosaic
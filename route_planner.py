@@ -2,6 +2,8 @@ import tkinter as tk
 import json
 from tkinter import Canvas
 
+from route_tools import optimize_route, path_length
+
 ROUTE_FILE = "route.json"
 
 def launch_route_planner():
@@ -10,14 +12,31 @@ def launch_route_planner():
             json.dump(route_points, f)
         root.destroy()
 
-    def on_click(event):
-        x, y = event.x, event.y
+    def add_point(x, y):
         canvas.create_oval(x - 4, y - 4, x + 4, y + 4, fill="blue")
         if route_points:
             last_x, last_y = route_points[-1]
             canvas.create_line(last_x, last_y, x, y, fill="blue", width=2)
         route_points.append((x, y))
 
+    def on_click(event):
+        add_point(event.x, event.y)
+
+    def optimize():
+        if len(route_points) < 3:
+            return
+        before = path_length(route_points)
+        points = optimize_route(route_points)
+        if path_length(points) >= before:
+            info.config(text=f"{before:.0f} px, no shorter order found")
+            return
+        canvas.delete("all")
+        route_points.clear()
+        for x, y in points:
+            add_point(x, y)
+        after = path_length(route_points)
+        info.config(text=f"{before:.0f} px -> {after:.0f} px")
+
     root = tk.Tk()
     root.title("Route Planner")
     root.attributes('-fullscreen', True)  
@@ -32,6 +51,11 @@ def launch_route_planner():
     done_button = tk.Button(root, text="Done", font=("Segoe UI", 12), bg="green", fg="white", command=save_route)
     done_button.place(relx=0.5, rely=0.95, anchor="center")
 
+    optimize_button = tk.Button(root, text="Optimize Route", font=("Segoe UI", 12), command=optimize)
+    optimize_button.place(relx=0.4, rely=0.95, anchor="center")
+    info = tk.Label(root, text="", font=("Segoe UI", 11), bg="white")
+    info.place(relx=0.6, rely=0.95, anchor="w")
+
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,415 @@
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+DEFAULT_SIMPLIFY_TOLERANCE = 3.0  # pixels
+DEFAULT_OPTIMIZE_TIME = 0.8       # seconds; the search returns its best tour so far at the limit
+OPTIMIZE_NEIGHBOURS = 8           # candidate moves per waypoint are limited to its nearest neighbours
+OR_OPT_MAX_SEGMENT = 3
+DEFAULT_COVERAGE_SPACING = 20.0   # pixels between sweep tracks (sensor footprint)
+_EPS = 1e-7
+
+
+def path_length(points, closed=False):
+    """Total length of the polyline through `points` (back to the start when `closed`)."""
+    if len(points) < 2:
+        return 0.0
+    pts = np.asarray(points, dtype=np.float64)
+    if closed:
+        pts = np.vstack([pts, pts[:1]])
+    return float(np.hypot(*np.diff(pts, axis=0).T).sum())
+
+
+def simplify_route(points, tolerance=DEFAULT_SIMPLIFY_TOLERANCE, closed=False):
+    """
+    Douglas-Peucker: drop waypoints that sit within `tolerance` of the line
+    between the waypoints kept around them. Endpoints always survive; a
+    closed route is split at its farthest point from the start so the loop
+    keeps its shape. Returns a new list of (x, y) tuples.
+    """
+    if len(points) < 3 or tolerance <= 0:
+        return [tuple(p) for p in points]
+    pts = np.asarray(points, dtype=np.float64)
+
+    if closed:
+        far = int(np.argmax(np.hypot(*(pts - pts[0]).T)))
+        if far == 0:
+            return [tuple(points[0])]
+        first = _douglas_peucker(pts[:far + 1], tolerance)
+        second = _douglas_peucker(np.vstack([pts[far:], pts[:1]]), tolerance)
+        keep = np.concatenate([np.flatnonzero(first), far + np.flatnonzero(second[:-1])])
+        keep = np.unique(keep)
+    else:
+        keep = np.flatnonzero(_douglas_peucker(pts, tolerance))
+    return [tuple(points[i]) for i in keep]
+
+
+def _douglas_peucker(pts, tolerance):
+    """Boolean keep-mask for an open polyline; iterative so long routes don't hit the recursion limit."""
+    keep = np.zeros(len(pts), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(pts) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = pts[start], pts[end]
+        inner = pts[start + 1:end]
+        ab = b - a
+        norm = np.hypot(*ab)
+        if norm == 0:
+            dist = np.hypot(*(inner - a).T)
+        else:
+            dist = np.abs(ab[0] * (inner[:, 1] - a[1]) - ab[1] * (inner[:, 0] - a[0])) / norm
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    return keep
+
+
+def _neighbour_lists(pts, k):
+    """
+    Indices of (roughly) the k nearest other points for every point. Points
+    are bucketed into a grid sized for ~k per cell and each cell only looks
+    at its 3x3 block, widening the block for sparse cells.
+    """
+    n = len(pts)
+    k = min(k, n - 1)
+    lo = pts.min(axis=0)
+    span = np.maximum(pts.max(axis=0) - lo, 1e-9)
+    cells_per_side = max(1, int(math.sqrt(n / max(k, 1))))
+    cell = np.minimum(((pts - lo) / span * cells_per_side).astype(np.int64), cells_per_side - 1)
+    cell_id = cell[:, 0] * cells_per_side + cell[:, 1]
+    order = np.argsort(cell_id, kind="stable")
+    starts = np.searchsorted(cell_id[order], np.arange(cells_per_side * cells_per_side + 1))
+
+    def members(cx0, cx1, cy0, cy1):
+        found = [order[starts[cx * cells_per_side + cy0]:starts[cx * cells_per_side + cy1 + 1]]
+                 for cx in range(max(cx0, 0), min(cx1, cells_per_side - 1) + 1)]
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    result = [None] * n
+    for cid in np.unique(cell_id):
+        cx, cy = divmod(int(cid), cells_per_side)
+        own = order[starts[cid]:starts[cid + 1]]
+        radius = 1
+        while True:
+            cand = members(cx - radius, cx + radius, max(cy - radius, 0), min(cy + radius, cells_per_side - 1))
+            if len(cand) > k or radius >= cells_per_side:
+                break
+            radius += 1
+        d2 = ((pts[own][:, None, :] - pts[cand][None, :, :]) ** 2).sum(axis=2)
+        d2[cand[None, :] == own[:, None]] = np.inf
+        kk = min(k, len(cand) - 1)
+        near = np.argpartition(d2, kk - 1, axis=1)[:, :kk]
+        near = np.take_along_axis(near, np.argsort(np.take_along_axis(d2, near, axis=1), axis=1), axis=1)
+        for row, i in enumerate(own.tolist()):
+            result[i] = cand[near[row]].tolist()
+    return result
+
+
+def _nearest_neighbour_tour(pts, start, neighbours):
+    """Greedy tour: nearest unvisited neighbour-list entry, else a full search over what is left."""
+    n = len(pts)
+    visited = np.zeros(n, dtype=bool)
+    tour = [start]
+    visited[start] = True
+    current = start
+    for _ in range(n - 1):
+        for c in neighbours[current]:
+            if not visited[c]:
+                current = c
+                break
+        else:
+            remaining = np.flatnonzero(~visited)
+            d2 = ((pts[remaining] - pts[current]) ** 2).sum(axis=1)
+            current = int(remaining[np.argmin(d2)])
+        visited[current] = True
+        tour.append(current)
+    return tour
+
+
+def optimize_route(points, closed=False, fix_start=True, time_limit=DEFAULT_OPTIMIZE_TIME):
+    """
+    Reorder waypoints to shorten the route: the shorter of the given order
+    and a nearest-neighbour tour as the seed, then 2-opt and Or-opt moves
+    restricted to each waypoint's nearest neighbours until nothing improves
+    or `time_limit` seconds have passed. The result is never longer than
+    the input. An open route may end anywhere; `fix_start` keeps the first
+    waypoint first. Returns a new list of (x, y) tuples.
+    """
+    n = len(points)
+    if n < 3 or (closed and n < 4):
+        return [tuple(p) for p in points]
+    deadline = time.perf_counter() + time_limit
+    pts = np.asarray(points, dtype=np.float64)
+    xs, ys = pts[:, 0].tolist(), pts[:, 1].tolist()
+    neighbours = _neighbour_lists(pts, OPTIMIZE_NEIGHBOURS)
+
+    # an open route is a closed tour through a dummy node `n` that is zero
+    # distance from everything; with fix_start its edge to waypoint 0 is pinned
+    given = path_length(pts, closed)
+    tour = _nearest_neighbour_tour(pts, 0, neighbours)
+    if path_length(pts[tour], closed) >= given:
+        tour = list(range(n))
+    if not closed:
+        tour.append(n)
+    size = len(tour)
+    pos = [0] * size
+    for i, c in enumerate(tour):
+        pos[c] = i
+    hypot = math.hypot
+
+    def dist(a, b):
+        if a == n or b == n:
+            return 0.0
+        return hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+    def pinned(a, b):
+        return not closed and fix_start and ((a == n and b == 0) or (a == 0 and b == n))
+
+    def reverse(i, j):
+        """Reverse the tour from position i forward to position j, inclusive."""
+        inner = (j - i) % size + 1
+        if 2 * inner > size:
+            # reversing the complement gives the same cycle and moves fewer nodes
+            i, j = (j + 1) % size, (i - 1) % size
+            inner = size - inner
+        if i <= j:
+            tour[i:j + 1] = tour[i:j + 1][::-1]
+            for k in range(i, j + 1):
+                pos[tour[k]] = k
+        else:
+            for _ in range(inner // 2):
+                a, b = tour[i], tour[j]
+                tour[i], tour[j] = b, a
+                pos[b], pos[a] = i, j
+                i, j = (i + 1) % size, (j - 1) % size
+
+    def two_opt(a):
+        for c in neighbours[a]:
+            sa, sc = tour[(pos[a] + 1) % size], tour[(pos[c] + 1) % size]
+            if c != sa and sc != a and not pinned(a, sa) and not pinned(c, sc):
+                if dist(a, sa) + dist(c, sc) - dist(a, c) - dist(sa, sc) > _EPS:
+                    reverse(pos[sa], pos[c])
+                    return (a, sa, c, sc)
+            pa, pc = tour[pos[a] - 1], tour[pos[c] - 1]
+            if c != pa and pc != a and not pinned(pa, a) and not pinned(pc, c):
+                if dist(pa, a) + dist(pc, c) - dist(a, c) - dist(pa, pc) > _EPS:
+                    reverse(pos[a], pos[pc])
+                    return (a, pa, c, pc)
+        return None
+
+    def or_opt(a):
+        i = pos[a]
+        for length in range(1, OR_OPT_MAX_SEGMENT + 1):
+            if i < 1 or i + length >= size:
+                return None
+            seg = tour[i:i + length]
+            if n in seg:
+                return None
+            s0, sl = seg[0], seg[-1]
+            p, nx = tour[i - 1], tour[i + length]
+            if pinned(p, s0) or pinned(sl, nx):
+                continue
+            removed = dist(p, s0) + dist(sl, nx) - dist(p, nx)
+            if removed <= _EPS:
+                continue
+            for c in neighbours[s0] + neighbours[sl]:
+                if c in seg:
+                    continue
+                sc = tour[(pos[c] + 1) % size]
+                if sc in seg or pinned(c, sc):
+                    continue
+                base = dist(c, sc)
+                forward = dist(c, s0) + dist(sl, sc) - base
+                backward = dist(c, sl) + dist(s0, sc) - base
+                if removed - min(forward, backward) > _EPS:
+                    del tour[i:i + length]
+                    j = pos[c] - length if pos[c] > i else pos[c]
+                    tour[j + 1:j + 1] = seg if forward <= backward else seg[::-1]
+                    for k in range(min(i, j + 1), min(size, max(i + length, j + 1 + length))):
+                        pos[tour[k]] = k
+                    return (p, nx, c, sc, s0, sl)
+        return None
+
+    queue = deque(range(n))
+    queued = [True] * n + [False]
+    while queue and time.perf_counter() < deadline:
+        a = queue.popleft()
+        queued[a] = False
+        touched = two_opt(a) or or_opt(a)
+        if touched:
+            for c in touched:
+                if c != n and not queued[c]:
+                    queued[c] = True
+                    queue.append(c)
+
+    if closed:
+        start = pos[0]
+        order = tour[start:] + tour[:start]
+    else:
+        cut = pos[n]
+        order = tour[cut + 1:] + tour[:cut]
+        if fix_start and order[0] != 0:
+            order.reverse()
+    if path_length(pts[order], closed) > given:
+        return [tuple(p) for p in points]
+    return [tuple(points[i]) for i in order]
+
+
+def _rotate(points, angle):
+    """Rotate (N, 2) points by -angle radians about the origin."""
+    c, s = math.cos(angle), math.sin(angle)
+    return points @ np.array([[c, -s], [s, c]])
+
+
+def _ring_edges(rings):
+    """All edges of the given rings as an (E, 4) x1, y1, x2, y2 array."""
+    edges = []
+    for ring in rings:
+        ring = np.asarray(ring, dtype=np.float64)
+        if len(ring) >= 3:
+            edges.append(np.hstack([ring, np.roll(ring, -1, axis=0)]))
+    return np.vstack(edges) if edges else np.empty((0, 4))
+
+
+def _sweep_intervals(edges, spacing):
+    """
+    Inside intervals along horizontal lines y = y0 + k * spacing, as
+    {k: [(x_start, x_end), ...]} sorted by x. Even-odd filling, so holes
+    (and self-overlaps) are cut out.
+    """
+    ylo = np.minimum(edges[:, 1], edges[:, 3])
+    yhi = np.maximum(edges[:, 1], edges[:, 3])
+    y0 = ylo.min() + spacing / 2
+    # half-open [ylo, yhi) per edge so a line through a vertex is counted once
+    kmin = np.ceil((ylo - y0) / spacing).astype(np.int64)
+    kmax = np.ceil((yhi - y0) / spacing).astype(np.int64) - 1
+    counts = np.maximum(kmax - kmin + 1, 0)
+    edge_idx = np.repeat(np.arange(len(edges)), counts)
+    k = np.repeat(kmin, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+    x1, y1, x2, y2 = edges[edge_idx].T
+    y = y0 + k * spacing
+    x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+
+    order = np.lexsort((x, k))
+    k, x = k[order], x[order]
+    intervals = {}
+    bounds = np.flatnonzero(np.diff(k)) + 1
+    for line_k, xs in zip(k[np.r_[0, bounds]] if len(k) else [], np.split(x, bounds) if len(k) else []):
+        pairs = xs[:len(xs) // 2 * 2].reshape(-1, 2)
+        pairs = pairs[pairs[:, 1] - pairs[:, 0] > _EPS]
+        if len(pairs):
+            intervals[int(line_k)] = [tuple(p) for p in pairs.tolist()]
+    return y0, intervals
+
+
+def _sweep_cells(intervals, slack=0.0):
+    """
+    Chain intervals on consecutive lines into cells that can each be swept
+    back and forth: a chain continues while its interval overlaps exactly
+    one interval on the next line and vice versa. `slack` widens the overlap
+    test so thin slanted strips stay one cell.
+    Returns [[(k, (x0, x1)), ...], ...].
+    """
+    cells = []
+    open_cells = {}  # (k, interval index) -> cell, for chains still growing
+    for k in sorted(intervals):
+        current = intervals[k]
+        below = intervals.get(k - 1, [])
+        next_open = {}
+        for i, (a0, a1) in enumerate(current):
+            overlaps = [j for j, (b0, b1) in enumerate(below) if b0 - slack < a1 and a0 < b1 + slack]
+            cell = None
+            if len(overlaps) == 1:
+                j = overlaps[0]
+                b0, b1 = below[j]
+                ups = [m for m, (c0, c1) in enumerate(current) if c0 - slack < b1 and b0 < c1 + slack]
+                if len(ups) == 1:
+                    cell = open_cells.get((k - 1, j))
+            if cell is None:
+                cell = []
+                cells.append(cell)
+            cell.append((k, (a0, a1)))
+            next_open[(k, i)] = cell
+        open_cells = next_open
+    return cells
+
+
+def _sweep_cell(cell, y0, spacing, from_top, from_left):
+    """Boustrophedon legs through one cell as a list of (x, y) waypoints, two per leg."""
+    rows = cell[::-1] if from_top else cell
+    points = []
+    left_to_right = from_left
+    for k, (x0, x1) in rows:
+        y = y0 + k * spacing
+        points += [(x0, y), (x1, y)] if left_to_right else [(x1, y), (x0, y)]
+        left_to_right = not left_to_right
+    return points
+
+
+def _best_sweep_angle(outer):
+    """Sweep direction (radians) along the polygon edge that gives the narrowest extent across it, i.e. fewest legs."""
+    ring = np.asarray(outer, dtype=np.float64)
+    d = np.roll(ring, -1, axis=0) - ring
+    candidates = np.unique(np.round(np.arctan2(d[:, 1], d[:, 0]) % math.pi, 6))
+    best, best_width = 0.0, None
+    for angle in candidates:
+        ys = _rotate(ring, angle)[:, 1]
+        width = ys.max() - ys.min()
+        if best_width is None or width < best_width - _EPS:
+            best, best_width = float(angle), width
+    return best
+
+
+def coverage_path(outer, holes=(), spacing=DEFAULT_COVERAGE_SPACING, angle=None, start=None):
+    """
+    Lawnmower sweep over a polygon: parallel tracks `spacing` apart at
+    `angle` degrees (None picks the direction needing the fewest tracks),
+    clipped to `outer` minus `holes`, so concave shapes and holes split the
+    tracks. Tracks are grouped into cells swept back and forth, and cells
+    are chained greedily from `start` (default: the first outer vertex),
+    which keeps the number of long transits and turns low. Transits between
+    cells are straight lines and may cross holes.
+    Returns [(x, y), ...] with one waypoint at each end of every track.
+    """
+    if len(outer) < 3 or spacing <= 0:
+        return []
+    theta = _best_sweep_angle(outer) if angle is None else math.radians(angle)
+    rings = [_rotate(np.asarray(r, dtype=np.float64), theta) for r in [outer, *holes] if len(r) >= 3]
+    edges = _ring_edges(rings)
+    edges = edges[np.abs(edges[:, 3] - edges[:, 1]) > _EPS]  # horizontal edges never cross a sweep line
+    if not len(edges):
+        return []
+    y0, intervals = _sweep_intervals(edges, spacing)
+    cells = _sweep_cells(intervals, slack=spacing)
+    if not cells:
+        return []
+
+    # four ways into every cell: first or last track, from its left or right end
+    entries = np.empty((len(cells), 4, 2))
+    for ci, cell in enumerate(cells):
+        (k0, (a0, a1)), (k1, (b0, b1)) = cell[0], cell[-1]
+        entries[ci] = [(a0, y0 + k0 * spacing), (a1, y0 + k0 * spacing),
+                       (b0, y0 + k1 * spacing), (b1, y0 + k1 * spacing)]
+    done = np.zeros(len(cells), dtype=bool)
+
+    here = _rotate(np.asarray([start if start is not None else outer[0]], dtype=np.float64), theta)[0]
+    route = []
+    for _ in range(len(cells)):
+        d2 = ((entries - here) ** 2).sum(axis=2)
+        d2[done] = np.inf
+        ci, way = divmod(int(np.argmin(d2)), 4)
+        done[ci] = True
+        legs = _sweep_cell(cells[ci], y0, spacing, from_top=way >= 2, from_left=way % 2 == 0)
+        route += legs
+        here = legs[-1]
+
+    back = _rotate(np.asarray(route, dtype=np.float64), -theta)
+    return [tuple(p) for p in back.tolist()]
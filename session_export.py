@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+import zipfile
+
+CHUNK_SIZE = 1024 * 1024
+PROGRESS_INTERVAL = 0.1  # seconds between on_progress calls
+# already-compressed formats are stored as-is instead of being deflated again
+STORED_EXTENSIONS = (".jpg", ".jpeg", ".png", ".mp4", ".avi")
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def session_files(session_id, log_dir="session_logs", snapshot_dir="session_snapshots", prefix=""):
+    """(source path, archive name) pairs for one session's summary, snapshots and clips."""
+    files = []
+    summary = os.path.join(log_dir, f"session_{session_id}.txt")
+    if os.path.exists(summary):
+        files.append((summary, prefix + "session_summary.txt"))
+    for label in ["known", "unknown", "clips"]:
+        folder = os.path.join(snapshot_dir, session_id, label)
+        if not os.path.isdir(folder):
+            continue
+        with os.scandir(folder) as it:
+            for entry in sorted(it, key=lambda e: e.name):
+                if entry.is_file():
+                    files.append((entry.path, f"{prefix}{label}/{entry.name}"))
+    return files
+
+
+class SessionExporter:
+    """
+    Streams one or more sessions straight from session_logs/session_snapshots
+    into a zip on a worker thread. A single session keeps the old flat
+    layout; several sessions each get their own folder in the archive.
+
+    on_progress(done_bytes, total_bytes) and on_done(dest, error) are called
+    from the worker thread. The archive is written to `<dest>.part` and only
+    renamed into place once complete, so a cancelled export leaves nothing behind.
+    """
+
+    def __init__(self, session_ids, dest, on_progress=None, on_done=None):
+        self.session_ids = list(session_ids)
+        self.dest = dest
+        self.on_progress = on_progress or (lambda done, total: None)
+        self.on_done = on_done or (lambda dest, error: None)
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="session-export", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _run(self):
+        tmp = self.dest + ".part"
+        try:
+            files = []
+            multi = len(self.session_ids) > 1
+            for session_id in self.session_ids:
+                files += session_files(session_id, prefix=f"{session_id}/" if multi else "")
+            total = sum(os.path.getsize(src) for src, _ in files)
+
+            done = 0
+            last_report = 0.0
+            with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zipf:
+                for src, arcname in files:
+                    info = zipfile.ZipInfo.from_file(src, arcname)
+                    info.compress_type = (zipfile.ZIP_STORED if src.lower().endswith(STORED_EXTENSIONS)
+                                          else zipfile.ZIP_DEFLATED)
+                    with open(src, "rb") as fsrc, zipf.open(info, "w") as fdst:
+                        while True:
+                            if self._cancel.is_set():
+                                raise ExportCancelled()
+                            chunk = fsrc.read(CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            fdst.write(chunk)
+                            done += len(chunk)
+                    if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                        last_report = time.monotonic()
+                        self.on_progress(done, total)
+            self.on_progress(done, total)
+            os.replace(tmp, self.dest)
+        except Exception as e:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            self.on_done(self.dest, e)
+            return
+        self.on_done(self.dest, None)
@@ -0,0 +1,114 @@
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+HASH_SIZE = 8                  # dHash grid: 8x8 gradient bits = 64-bit hash
+DEFAULT_DEDUP_THRESHOLD = 6    # max differing bits for two crops to count as the same shot
+DEFAULT_DEDUP_RECENT = 32      # snapshots remembered per label
+
+
+def dhash(image):
+    """64-bit difference hash of a BGR or grayscale image: is each pixel brighter than its right neighbour."""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+def crop_hash(frame, box):
+    """dHash of the (x, y, w, h) region of `frame`, or None if the box lies outside it."""
+    x, y, w, h = (int(v) for v in box)
+    crop = frame[max(y, 0):y + h, max(x, 0):x + w]
+    if crop.shape[0] < 2 or crop.shape[1] < 2:
+        return None
+    return dhash(crop)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class SnapshotDeduper:
+    """
+    Per-session index of recent face-crop hashes, one pool per label.
+
+    The 64 hash bits are split into threshold + 1 bands; two hashes within
+    `threshold` bits of each other must agree exactly on at least one band,
+    so a lookup only compares against the few entries sharing a band value
+    instead of scanning the label's history. Each label keeps its last
+    `recent` snapshots.
+    """
+
+    def __init__(self, threshold=DEFAULT_DEDUP_THRESHOLD, recent=DEFAULT_DEDUP_RECENT):
+        self.threshold = int(threshold)
+        self.recent = int(recent)
+        bands = min(self.threshold + 1, HASH_SIZE * HASH_SIZE)
+        width, extra = divmod(HASH_SIZE * HASH_SIZE, bands)
+        self._bands = []  # (shift, mask)
+        shift = 0
+        for i in range(bands):
+            bits = width + (i < extra)
+            self._bands.append((shift, (1 << bits) - 1))
+            shift += bits
+        self._lock = threading.Lock()
+        self._buckets = {}  # (label, band, value) -> [(hash, path), ...]
+        self._history = {}  # label -> deque of [(hash, path), ...] per snapshot, oldest first
+
+    def _keys(self, label, value):
+        return [(label, i, (value >> shift) & mask) for i, (shift, mask) in enumerate(self._bands)]
+
+    def match(self, label, hashes):
+        """
+        Path of an earlier snapshot of `label` whose crops are all within the
+        threshold of `hashes`, else None. An empty or partial hash list never
+        matches.
+        """
+        if not hashes or None in hashes:
+            return None
+        original = None
+        with self._lock:
+            for value in hashes:
+                found = None
+                for key in self._keys(label, value):
+                    for entry in self._buckets.get(key, ()):
+                        if hamming(value, entry[0]) <= self.threshold:
+                            found = entry[1]
+                            break
+                    if found:
+                        break
+                if found is None:
+                    return None
+                original = original or found
+        return original
+
+    def add(self, label, hashes, path):
+        with self._lock:
+            entries = [(value, path) for value in hashes if value is not None]
+            if not entries:
+                return
+            for entry in entries:
+                for key in self._keys(label, entry[0]):
+                    self._buckets.setdefault(key, []).append(entry)
+            history = self._history.setdefault(label, deque())
+            history.append(entries)
+            # evict whole snapshots, however many faces each one held
+            while len(history) > self.recent:
+                for old in history.popleft():
+                    for key in self._keys(label, old[0]):
+                        bucket = self._buckets[key]
+                        bucket.remove(old)
+                        if not bucket:
+                            del self._buckets[key]
+
+
+def make_snapshot_deduper(settings):
+    """SnapshotDeduper when snapshot_dedup_enabled is set, else None (every snapshot is written)."""
+    if not settings.get("snapshot_dedup_enabled"):
+        return None
+    return SnapshotDeduper(
+        threshold=settings.get("snapshot_dedup_threshold", DEFAULT_DEDUP_THRESHOLD),
+        recent=settings.get("snapshot_dedup_recent", DEFAULT_DEDUP_RECENT),
+    )
@@ -0,0 +1,152 @@
+import os
+import queue
+import threading
+
+import cv2
+
+from annotation import snapshot_path, stamp_snapshot
+from snapshot_dedup import crop_hash
+from stage_metrics import NULL_METRICS
+from thumbnails import THUMB_SIZE, THUMB_JPEG_QUALITY, thumbnail_path
+
+DEFAULT_JPEG_QUALITY = 90
+DEFAULT_QUEUE_SIZE = 8
+
+
+class SnapshotWriter:
+    """
+    Background JPEG writer for detection snapshots.
+
+    submit() takes one copy of the frame together with every (label, folder)
+    that should receive it, and returns immediately. Worker threads stamp the
+    labels/location once, encode once and write the bytes (plus a gallery
+    thumbnail sidecar) to each target.
+    When the queue is full the snapshot is dropped instead of blocking capture.
+
+    With a SnapshotDeduper, a target whose face crops all match a recent
+    snapshot of the same label is not written at all; submit() hands back
+    that earlier snapshot's path for it instead.
+    """
+
+    def __init__(self, jpeg_quality=DEFAULT_JPEG_QUALITY, max_pending=DEFAULT_QUEUE_SIZE, workers=1,
+                 metrics=NULL_METRICS, dedup=None):
+        self.jpeg_quality = int(jpeg_quality)
+        self.metrics = metrics
+        self.dedup = dedup
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.peak_pending = 0
+        self.deduplicated = 0
+        self.bytes_written = 0
+        self._threads = [
+            threading.Thread(target=self._run, name=f"snapshot-writer-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, frame, targets, timestamp, coords, boxes=None):
+        """
+        Queue `frame` for writing. `targets` is a list of (label, folder);
+        `boxes`, if given, holds the (x, y, w, h) face box of each target and
+        enables deduplication. Returns the snapshot path of each target (an
+        earlier snapshot's path for a near-duplicate), or None if the
+        snapshot was dropped because the writer is behind.
+        """
+        if not targets:
+            return []
+        paths = {}
+        hashes = {}
+        if self.dedup is not None and boxes:
+            crops = {}
+            for target, box in zip(targets, boxes):
+                crops.setdefault(target, []).append(crop_hash(frame, box))
+            for target, values in crops.items():
+                original = self.dedup.match(target[0], values)
+                if original is None:
+                    hashes[target] = values
+                else:
+                    paths[target] = original
+
+        fresh = [target for target in dict.fromkeys(targets) if target not in paths]
+        if fresh:
+            job = (frame.copy(), fresh, [label for label, _ in targets], timestamp, coords, hashes)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+                return None
+            for label, folder in fresh:
+                paths[(label, folder)] = snapshot_path(folder, label, timestamp)
+        with self._lock:
+            if fresh:
+                self.submitted += 1
+                self.peak_pending = max(self.peak_pending, self._queue.qsize())
+            self.deduplicated += len(dict.fromkeys(targets)) - len(fresh)
+        return [paths[target] for target in targets]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "pending": self._queue.qsize(),
+                "peak_pending": self.peak_pending,
+                "deduplicated": self.deduplicated,
+                # estimated from the average size of the snapshots that were written
+                "bytes_saved": self.deduplicated * self.bytes_written // self.written if self.written else 0,
+            }
+
+    def close(self, timeout=5.0):
+        """Flush what is queued, then stop the workers."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            frame, targets, labels, timestamp, coords, hashes = job
+            timer = self.metrics.timer()
+            try:
+                self._write(frame, targets, labels, timestamp, coords, hashes)
+                timer.lap("imwrite")
+            except Exception as e:
+                print(f"Snapshot write failed: {e}")
+                with self._lock:
+                    self.failed += 1
+
+    def _write(self, frame, targets, labels, timestamp, coords, hashes):
+        stamp_snapshot(frame, labels, timestamp, coords)
+        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            raise RuntimeError("JPEG encode failed")
+        ok, thumb = cv2.imencode(".jpg", cv2.resize(frame, THUMB_SIZE, interpolation=cv2.INTER_AREA),
+                                 [cv2.IMWRITE_JPEG_QUALITY, THUMB_JPEG_QUALITY])
+        if not ok:
+            raise RuntimeError("thumbnail encode failed")
+        data = jpeg.tobytes()
+        for label, folder in targets:
+            path = snapshot_path(folder, label, timestamp)
+            with open(path, "wb") as f:
+                f.write(data)
+            thumb_path = thumbnail_path(path)
+            os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+            with open(thumb_path, "wb") as f:
+                f.write(thumb.tobytes())
+            # only files that exist may become the original later duplicates point at
+            if (label, folder) in hashes:
+                self.dedup.add(label, hashes[(label, folder)], path)
+        with self._lock:
+            self.written += len(targets)
+            self.bytes_written += len(targets) * (len(data) + thumb.nbytes)
@@ -0,0 +1,245 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+DEFAULT_WINDOW = 300          # samples kept per stage for the rolling percentiles
+DEFAULT_METRICS_FILE = "session_logs/metrics.json"
+DEFAULT_METRICS_INTERVAL = 5  # seconds between metrics file dumps
+# Prometheus histogram bucket bounds, seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+METRIC_PREFIX = "drone_stage_seconds"
+
+
+class StageTimer:
+    """Lap timer for one pass through the hot path: lap(stage) records the time since the previous lap."""
+
+    __slots__ = ("metrics", "last")
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.metrics.add(stage, now - self.last)
+        self.last = now
+
+    def skip(self):
+        """Restart the clock without recording, e.g. after blocking on a queue."""
+        self.last = time.perf_counter()
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def lap(self, stage):
+        pass
+
+    def skip(self):
+        pass
+
+
+class _NullMetrics:
+    """Stand-in used when instrumentation is off: every call is a no-op."""
+
+    enabled = False
+    _timer = _NullTimer()
+
+    def timer(self):
+        return self._timer
+
+    def add(self, stage, seconds):
+        pass
+
+    def frame_done(self):
+        pass
+
+
+NULL_METRICS = _NullMetrics()
+
+
+class StageMetrics:
+    """
+    Thread-safe per-stage timings. Each stage keeps the last `window`
+    samples for percentiles plus cumulative bucket counts for Prometheus;
+    frame_done() timestamps feed the fps estimate.
+    """
+
+    enabled = True
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._totals = {}  # stage -> [count, sum, bucket counts...]
+        self._frames = deque(maxlen=window)
+
+    def timer(self):
+        return StageTimer(self)
+
+    def add(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+                self._totals[stage] = [0, 0.0] + [0] * len(BUCKETS)
+            samples.append(seconds)
+            totals = self._totals[stage]
+            totals[0] += 1
+            totals[1] += seconds
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    totals[2 + i] += 1
+                    break
+
+    def frame_done(self):
+        with self._lock:
+            self._frames.append(time.perf_counter())
+
+    def fps(self):
+        with self._lock:
+            frames = list(self._frames)
+        if len(frames) < 2 or frames[-1] == frames[0]:
+            return 0.0
+        return (len(frames) - 1) / (frames[-1] - frames[0])
+
+    def snapshot(self):
+        """{"fps": .., "stages": {stage: {count, mean_ms, p50_ms, p95_ms, max_ms}}} over the window."""
+        with self._lock:
+            samples = {stage: np.fromiter(s, dtype=np.float64) for stage, s in self._samples.items()}
+            counts = {stage: t[0] for stage, t in self._totals.items()}
+        stages = {}
+        for stage, arr in samples.items():
+            ms = arr * 1000
+            stages[stage] = {
+                "count": counts[stage],
+                "mean_ms": round(float(ms.mean()), 3),
+                "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                "p95_ms": round(float(np.percentile(ms, 95)), 3),
+                "max_ms": round(float(ms.max()), 3),
+            }
+        return {"fps": round(self.fps(), 2), "stages": stages}
+
+    def prometheus(self):
+        """Cumulative histograms in the Prometheus text exposition format."""
+        with self._lock:
+            totals = {stage: list(t) for stage, t in self._totals.items()}
+        lines = [
+            f"# HELP {METRIC_PREFIX} Time spent in each stage of the capture/recognition/render path.",
+            f"# TYPE {METRIC_PREFIX} histogram",
+        ]
+        for stage, (count, total, *buckets) in sorted(totals.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS, buckets):
+                cumulative += n
+                lines.append(f'{METRIC_PREFIX}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{METRIC_PREFIX}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{METRIC_PREFIX}_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{METRIC_PREFIX}_count{{stage="{stage}"}} {count}')
+        lines += ["# HELP drone_fps Frames completed per second over the rolling window.",
+                  "# TYPE drone_fps gauge",
+                  f"drone_fps {self.fps():.2f}"]
+        return "\n".join(lines) + "\n"
+
+
+def draw_metrics_overlay(frame, metrics, stages=None):
+    """Print fps and the mean/p95 of each stage in the top-left corner of `frame`."""
+    snap = metrics.snapshot()
+    lines = [f"{snap['fps']:.1f} fps"]
+    for stage, s in snap["stages"].items():
+        if stages is None or stage in stages:
+            lines.append(f"{stage} {s['mean_ms']:.1f} / {s['p95_ms']:.1f} ms")
+    for i, text in enumerate(lines):
+        y = 18 + 16 * i
+        cv2.putText(frame, text, (8, y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 0, 0), 3)
+        cv2.putText(frame, text, (8, y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1)
+
+
+class MetricsReporter:
+    """
+    Publishes a StageMetrics on a background thread: a JSON snapshot
+    rewritten every `interval` seconds and/or a /metrics endpoint on
+    127.0.0.1:`port` for Prometheus to scrape.
+    """
+
+    def __init__(self, metrics, path=None, interval=DEFAULT_METRICS_INTERVAL, port=None):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.port = port
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+
+    def start(self):
+        if self.path:
+            self._thread = threading.Thread(target=self._run, name="metrics-dump", daemon=True)
+            self._thread.start()
+        if self.port:
+            metrics = self.metrics
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.rstrip("/") not in ("", "/metrics"):
+                        self.send_error(404)
+                        return
+                    body = metrics.prometheus().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            try:
+                self._server = ThreadingHTTPServer(("127.0.0.1", int(self.port)), Handler)
+            except OSError as e:
+                print(f"Metrics endpoint not started on port {self.port}: {e}")
+            else:
+                threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop both outputs; the file gets one last dump so it covers the whole session."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def dump(self):
+        report = dict(self.metrics.snapshot(), updated=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._dump_safely()
+        self._dump_safely()
+
+    def _dump_safely(self):
+        try:
+            self.dump()
+        except OSError as e:
+            print(f"Metrics dump failed: {e}")
+
+
+def make_metrics(settings):
+    """StageMetrics when metrics_enabled (or the overlay) is on, else the shared no-op NULL_METRICS."""
+    if not (settings.get("metrics_enabled") or settings.get("metrics_overlay")):
+        return NULL_METRICS
+    return StageMetrics(window=settings.get("metrics_window", DEFAULT_WINDOW))
@@ -0,0 +1,93 @@
+"""
+Headless surveillance daemon: runs recognition sessions without the Tk window,
+writing snapshots, the event store and session summaries exactly like the GUI.
+
+    python surveillance_daemon.py                          # sources from gui_settings.json
+    python surveillance_daemon.py --source 0 --source rtsp://cam2/stream
+    python surveillance_daemon.py --session-minutes 60     # rotate sessions hourly
+
+Stops cleanly on Ctrl+C / SIGTERM (the current session's summary is written
+before exiting), when --duration elapses, or when every recorded feed ends.
+"""
+import argparse
+import signal
+import threading
+import time
+from datetime import datetime
+
+from app_settings import load_settings
+from surveillance_engine import SurveillanceEngine
+
+
+def install_stop_handlers(stop_event):
+    def request_stop(signum, frame):
+        print(f"Received signal {signum}, stopping...")
+        stop_event.set()
+
+    for name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), request_stop)
+
+
+def print_alert(label, alert):
+    if alert:
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Target acquired: {label}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run face recognition sessions headless.")
+    parser.add_argument("--source", action="append", default=[],
+                        help="camera index, video file or stream URL (repeatable; default: settings)")
+    parser.add_argument("--settings", default=None, help="settings file (default: gui_settings.json)")
+    parser.add_argument("--known-faces", default="known_faces", help="enrollment folder (default: known_faces)")
+    parser.add_argument("--duration", type=float, default=None, metavar="SECONDS",
+                        help="stop after this many seconds")
+    parser.add_argument("--session-minutes", type=float, default=None,
+                        help="close the session and start a new one this often")
+    args = parser.parse_args(argv)
+
+    settings = load_settings(args.settings) if args.settings else load_settings()
+    if args.source:
+        settings["camera_sources"] = args.source
+
+    stop = threading.Event()
+    finished = threading.Event()
+    install_stop_handlers(stop)
+
+    def on_finished():
+        finished.set()
+        stop.set()
+
+    engine = SurveillanceEngine(args.known_faces, on_target=print_alert, on_finished=on_finished)
+    deadline = time.monotonic() + args.duration if args.duration else None
+    rotate = args.session_minutes * 60 if args.session_minutes else None
+
+    while not stop.is_set():
+        data = engine.start_session(settings)
+        print(f"Session {data['session_id']} started ({len(settings['camera_sources'] or [0])} source(s))",
+              flush=True)
+
+        wait = rotate
+        if deadline is not None:
+            remaining = max(0.0, deadline - time.monotonic())
+            wait = remaining if wait is None else min(wait, remaining)
+        # short waits keep signal handling responsive on Windows
+        session_end = time.monotonic() + wait if wait is not None else None
+        while not stop.is_set() and (session_end is None or time.monotonic() < session_end):
+            stop.wait(0.5)
+
+        for session in engine.stop_session():
+            print(f"Session {session['session_id']} ended: {session['total_faces']} faces, "
+                  f"summary in {session['file_name']}", flush=True)
+
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        if finished.is_set():
+            break
+
+    engine.event_store.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,444 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+import cv2
+
+from recognize_juliana_2_6_25 import setup_folders
+from frame_pipeline import FramePacket, LatestQueue, PipelineStage, LatencyStats
+from face_tracker import FaceTracker
+from face_cache import KnownFaceCache
+from face_gallery import FaceGallery, recognize_or_track, MATCH_THRESHOLD
+from face_detector import make_detector
+from identity_cache import make_identity_cache
+from annotation import TARGET_LABEL, SNAPSHOT_INTERVAL, draw_detections, snapshot_targets
+from snapshot_writer import SnapshotWriter
+from snapshot_dedup import make_snapshot_deduper
+from clip_recorder import CLIP_DIR, make_clip_recorder
+from location_service import LocationService, make_location_backend
+from event_store import EventStore, summary_lines
+from multi_camera import MultiCameraManager, parse_source
+from app_settings import load_settings
+from stage_metrics import NULL_METRICS, MetricsReporter, draw_metrics_overlay, make_metrics
+
+ALERT_INTERVAL = 10  # seconds between on-screen/console alerts for the same label
+STOP_JOIN_TIMEOUT = 2.0
+
+
+class SurveillanceEngine:
+    """
+    Capture, recognition and session bookkeeping without any GUI. The Tk app
+    and the headless daemon both drive sessions through start_session() /
+    stop_session() and read the newest annotated frame with latest().
+
+    Callbacks run on worker threads, so they must not block or call
+    stop_session() themselves:
+      on_target(label, alert)  every target detection; `alert` is True at most
+                               once per ALERT_INTERVAL for each label
+      on_finished()            every recorded feed in the session has ended
+    """
+
+    def __init__(self, known_faces_dir="known_faces", on_target=None, on_finished=None):
+        self.on_target = on_target or (lambda label, alert: None)
+        self.on_finished = on_finished or (lambda: None)
+
+        setup_folders()
+        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        self.face_cache = KnownFaceCache(known_faces_dir, self.face_cascade)
+        self.known_faces = self.face_cache.load()
+        self.gallery = FaceGallery(self.known_faces)
+        os.makedirs("session_logs", exist_ok=True)
+        os.makedirs("session_snapshots", exist_ok=True)
+        self.event_store = EventStore()
+        threading.Thread(target=self.event_store.import_legacy_summaries,
+                         args=("session_logs",), daemon=True).start()
+
+        self.running = False
+        self.cap = None
+        self.session_data = {}
+        self.stream_sessions = {}
+        self.last_snapshot_time = datetime.min
+        self.last_alert_time = {}
+        self.snapshot_folder_known = ""
+        self.snapshot_folder_unknown = ""
+
+        self.frame_lock = threading.Lock()
+        # newest annotated frame, already converted to RGB by the producer
+        self.latest_frame = None
+        self.latest_frame_seq = -1
+        self.frame_interval = 1 / 30
+        self._last_publish = None
+
+        # capture -> detect -> annotate hand-off (rebuilt for every session)
+        self.pipeline_stop = threading.Event()
+        self.pipeline_threads = []
+        self.detect_queue = None
+        self.annotate_queue = None
+        self.pipeline_latency = LatencyStats()
+        self.tracker = None
+        self.match_threshold = MATCH_THRESHOLD
+        self.detector = None
+        self.identities = None
+        self.capture_mirror = True
+        self.camera_manager = None
+        self.snapshot_writer = None
+        self.clip_recorder = None
+        self.location = None
+        # per-stage timers; NULL_METRICS (no-ops) unless metrics_enabled
+        self.metrics = NULL_METRICS
+        self.metrics_overlay = False
+        self.metrics_reporter = None
+
+    def reload_known_faces(self):
+        """Re-read the enrollment folder; returns the cache stats. Applies to the next session."""
+        self.known_faces = self.face_cache.load()
+        self.gallery = FaceGallery(self.known_faces)
+        return self.face_cache.stats
+
+    def latest(self):
+        """(rgb frame or None, sequence number, smoothed seconds between frames)"""
+        # producers publish a new array per frame and never touch it again,
+        # so handing out the reference is enough - no copy under the lock
+        with self.frame_lock:
+            return self.latest_frame, self.latest_frame_seq, self.frame_interval
+
+    def start_session(self, settings=None):
+        """Start capturing from every configured source; returns the (first) session's data."""
+        if self.running:
+            return self.session_data
+        settings = settings or load_settings()
+        sources = settings["camera_sources"] or [0]
+        self.running = True
+        self.last_snapshot_time = datetime.min
+        with self.frame_lock:
+            self.latest_frame = None
+            self._last_publish = None
+        self.start_metrics(settings)
+
+        now = datetime.now()
+        timestamp = now.strftime('%Y-%m-%d_%H-%M-%S')
+        if len(sources) == 1:
+            source = parse_source(sources[0])
+            self.cap = cv2.VideoCapture(source)
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+            self.capture_mirror = isinstance(source, int)
+            self.session_data = self.new_session(now, timestamp)
+            self.stream_sessions = {}
+            self.start_pipeline(settings)
+        else:
+            self.start_multi_camera(settings, sources, now, timestamp)
+        return self.session_data
+
+    def stop_session(self):
+        """Stop capture, flush snapshots and write the summaries; returns the finished sessions."""
+        if not self.running:
+            return []
+        self.running = False
+        self.pipeline_stop.set()
+
+        if self.camera_manager:
+            self.camera_manager.stop()
+            end_time = datetime.now()
+            finished = []
+            for stream_id, data in self.stream_sessions.items():
+                data["end_time"] = end_time
+                data["dropped_frames"] = self.camera_manager.dropped[stream_id]
+                data["snapshot_stats"] = self.camera_manager.snapshot_stats.get(stream_id)
+                data["clip_stats"] = self.camera_manager.clip_stats.get(stream_id)
+                data["recognition_stats"] = self.camera_manager.recognition_stats.get(stream_id)
+                self.save_summary_to_file(data)
+                finished.append(data)
+            self.camera_manager = None
+            self.stop_metrics()
+            return finished
+
+        # let the stages drain out before their resources go away
+        for thread in self.pipeline_threads:
+            thread.join(timeout=STOP_JOIN_TIMEOUT)
+        self.pipeline_threads = []
+        self.session_data["end_time"] = datetime.now()
+        self.session_data["dropped_frames"] = self.detect_queue.dropped + self.annotate_queue.dropped
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+        self.location.stop()
+        self.snapshot_writer.close()
+        self.session_data["snapshot_stats"] = self.snapshot_writer.stats()
+        if self.identities:
+            self.session_data["recognition_stats"] = self.identities.stats()
+        if self.clip_recorder:
+            self.clip_recorder.close()
+            self.session_data["clip_stats"] = self.clip_recorder.stats()
+            self.clip_recorder = None
+        self.save_summary_to_file()
+        self.stop_metrics()
+        return [self.session_data]
+
+    def start_metrics(self, settings):
+        self.metrics = make_metrics(settings)
+        self.metrics_overlay = bool(settings.get("metrics_overlay")) and self.metrics.enabled
+        self.metrics_reporter = None
+        if settings.get("metrics_enabled") and (settings.get("metrics_file") or settings.get("metrics_port")):
+            self.metrics_reporter = MetricsReporter(
+                self.metrics, path=settings.get("metrics_file"),
+                interval=settings["metrics_interval"], port=settings.get("metrics_port"),
+            ).start()
+
+    def stop_metrics(self):
+        if self.metrics_reporter:
+            self.metrics_reporter.stop()
+            self.metrics_reporter = None
+
+    def new_session(self, now, session_id):
+        """Create the snapshot folders and counters for one session (one per stream)."""
+        known = f"session_snapshots/{session_id}/known"
+        unknown = f"session_snapshots/{session_id}/unknown"
+        clips = f"session_snapshots/{session_id}/{CLIP_DIR}"
+        os.makedirs(known, exist_ok=True)
+        os.makedirs(unknown, exist_ok=True)
+        self.snapshot_folder_known = known
+        self.snapshot_folder_unknown = unknown
+        file_name = f"session_logs/session_{session_id}.txt"
+
+        self.event_store.save_session(
+            session_id, start_time=now, summary_file=file_name,
+            snapshot_known=known, snapshot_unknown=unknown,
+        )
+        return {
+            "session_id": session_id,
+            "start_time": now,
+            "end_time": None,
+            "total_faces": 0,
+            "juliana_faces": 0,
+            "unknown_faces": 0,
+            "detected_names": {},
+            # one per face track rather than per frame; needs the identity cache
+            "appearances": {},
+            "last_location": None,
+            "last_location_time": None,
+            "file_name": file_name,
+            "snapshot_folder_known": known,
+            "snapshot_folder_unknown": unknown,
+            "clip_folder": clips,
+            "latency": LatencyStats(),
+            "dropped_frames": 0,
+            "snapshot_stats": None,
+            "clip_stats": None,
+            "recognition_stats": None,
+        }
+
+    def start_multi_camera(self, settings, sources, now, timestamp):
+        """Hand every source to its own worker process; results come back via the manager."""
+        self.stream_sessions = {}
+        streams = []
+        for stream_id, source in enumerate(sources):
+            data = self.new_session(now, f"{timestamp}_cam{stream_id}")
+            self.stream_sessions[stream_id] = data
+            streams.append((stream_id, source, {
+                "known": data["snapshot_folder_known"],
+                "unknown": data["snapshot_folder_unknown"],
+                "clips": data["clip_folder"],
+            }))
+        self.session_data = self.stream_sessions[0]
+
+        self.camera_manager = MultiCameraManager(
+            streams, self.known_faces, settings,
+            on_event=self.on_stream_event, on_frame=self.publish_frame,
+            on_finished=self.on_finished,
+        )
+        for stream_id, latency in self.camera_manager.latency.items():
+            self.stream_sessions[stream_id]["latency"] = latency
+        self.camera_manager.start()
+
+    def on_stream_event(self, event):
+        data = self.stream_sessions[event["stream"]]
+        self.record_detections(data, event["detections"], event["timestamp"], event["location"],
+                               seq=event["seq"], position=event["position"],
+                               snapshot_paths=event["snapshots"], appearances=event["appearances"])
+
+    def publish_frame(self, frame, seq=None):
+        """Hand a finished BGR frame to the display; the colour conversion happens here, off the Tk thread."""
+        timer = self.metrics.timer()
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        timer.lap("to_rgb")
+        self.metrics.frame_done()
+        now = time.perf_counter()
+        with self.frame_lock:
+            if self._last_publish is not None:
+                self.frame_interval = 0.8 * self.frame_interval + 0.2 * (now - self._last_publish)
+            self._last_publish = now
+            self.latest_frame = rgb
+            self.latest_frame_seq = seq if seq is not None else self.latest_frame_seq + 1
+
+    def start_pipeline(self, settings):
+        """Spin up capture, detection and annotation as separate stages."""
+        self.pipeline_stop = threading.Event()
+        self.detect_queue = LatestQueue(maxsize=1)
+        self.annotate_queue = LatestQueue(maxsize=1)
+        self.pipeline_latency = self.session_data["latency"]
+
+        self.match_threshold = settings["match_threshold"]
+        self.detector = make_detector(self.face_cascade, settings)
+        self.identities = make_identity_cache(settings)
+        self.location = LocationService(make_location_backend(settings), ttl=settings["location_ttl"],
+                                        metrics=self.metrics).start()
+        self.snapshot_writer = SnapshotWriter(
+            jpeg_quality=settings["snapshot_jpeg_quality"],
+            max_pending=settings["snapshot_queue_size"],
+            metrics=self.metrics,
+            dedup=make_snapshot_deduper(settings),
+        )
+        self.clip_recorder = make_clip_recorder(self.session_data["clip_folder"], settings)
+        self.tracker = None
+        if settings["tracking_enabled"]:
+            self.tracker = FaceTracker(
+                detect_every_n=settings["detect_every_n"],
+                redetect_confidence=settings["redetect_confidence"],
+            )
+
+        self.pipeline_threads = [
+            threading.Thread(target=self.frame_capture_loop, name="capture",
+                             args=(self.pipeline_stop, self.detect_queue), daemon=True),
+            PipelineStage("detect", self.detect_stage, self.detect_queue,
+                          self.annotate_queue, self.pipeline_stop),
+            PipelineStage("annotate", self.annotate_stage, self.annotate_queue,
+                          None, self.pipeline_stop),
+        ]
+        for thread in self.pipeline_threads:
+            thread.start()
+
+    def frame_capture_loop(self, stop_event, out_queue):
+        seq = 0
+        timer = self.metrics.timer()
+        while not stop_event.is_set() and self.cap:
+            timer.skip()
+            ret, frame = self.cap.read()
+            timer.lap("cap.read")
+            if not ret:
+                if self.capture_mirror:
+                    continue
+                # end of a recorded feed
+                self.on_finished()
+                return
+
+            if self.capture_mirror:
+                frame = cv2.flip(frame, 1)
+                timer.lap("flip")
+            out_queue.put(FramePacket(seq, frame))
+            seq += 1
+
+    def detect_stage(self, packet):
+        timer = self.metrics.timer()
+        packet.gray = cv2.cvtColor(packet.image, cv2.COLOR_BGR2GRAY)
+        timer.lap("cvtColor")
+        packet.detections, packet.unknown_count = recognize_or_track(
+            packet.gray, self.face_cascade, self.gallery, self.tracker, self.match_threshold, self.detector,
+            self.identities
+        )
+        if self.identities:
+            packet.appearances = self.identities.pop_appearances()
+        timer.lap("recognize")
+        return packet
+
+    def annotate_stage(self, packet):
+        frame = packet.image
+        now = packet.timestamp
+        coords = None
+        snapshots = None
+        timer = self.metrics.timer()
+        if (now - self.last_snapshot_time).total_seconds() >= SNAPSHOT_INTERVAL:
+            coords = self.location.current()
+            timer.lap("location")
+
+        draw_detections(frame, packet.detections)
+        timer.lap("draw")
+        if coords is not None:
+            targets = snapshot_targets(packet.detections, self.snapshot_folder_known, self.snapshot_folder_unknown)
+            boxes = [d[:4] for d in packet.detections]
+            snapshots = self.snapshot_writer.submit(frame, targets, now, coords, boxes)
+            self.last_snapshot_time = now
+            timer.lap("snapshot.submit")
+
+        self.record_detections(self.session_data, packet.detections, now, coords,
+                               seq=packet.seq, position=coords or self.location.current(),
+                               snapshot_paths=snapshots, appearances=packet.appearances)
+        timer.lap("record")
+        if self.clip_recorder:
+            self.clip_recorder.push(frame, now)
+            known = [d[4] for d in packet.detections if d[4] != "Unknown"]
+            if known:
+                self.clip_recorder.trigger(known[0], now)
+            timer.lap("clip.push")
+        if self.metrics_overlay:
+            # stills and clips keep the clean frame; only the live view gets the overlay
+            frame = frame.copy()
+            draw_metrics_overlay(frame, self.metrics)
+        self.publish_frame(frame, packet.seq)
+        self.pipeline_latency.add(packet.age())
+
+    def record_detections(self, data, detections, now, coords=None, seq=None, position=None, snapshot_paths=None,
+                          appearances=None):
+        """
+        Update session counters for one frame's detections, log them to the
+        event store and raise the target callback. `coords` is set on snapshot
+        frames and becomes the last known location; `appearances` lists the
+        labels of tracks that were (re)identified on this frame.
+        """
+        for label in appearances or ():
+            data["appearances"][label] = data["appearances"].get(label, 0) + 1
+        self.event_store.record_detections(
+            data["session_id"], now, seq, detections, position, snapshot_paths
+        )
+        for (x, y, w, h, label, score) in detections:
+            data["total_faces"] += 1
+            if label == TARGET_LABEL:
+                data["juliana_faces"] += 1
+
+                current_time = time.time()
+                alert = current_time - self.last_alert_time.get(label, 0) > ALERT_INTERVAL
+                if alert:
+                    self.last_alert_time[label] = current_time
+                self.on_target(label, alert)
+            else:
+                data["unknown_faces"] += 1
+
+            data["detected_names"][label] = data["detected_names"].get(label, 0) + 1
+
+        if coords is not None and detections:
+            data["last_location"] = coords
+            data["last_location_time"] = now.strftime("%H:%M:%S")
+
+    def save_summary_to_file(self, data=None):
+        data = data or self.session_data
+        if not data["end_time"]:
+            return
+
+        location = data["last_location"] if data["last_location_time"] else None
+        latency = data["latency"].summary()
+        self.event_store.save_session(
+            data["session_id"],
+            end_time=data["end_time"],
+            last_lat=str(location[0]) if location else None,
+            last_lon=str(location[1]) if location else None,
+            last_location_time=data["last_location_time"],
+            stats={
+                "latency": latency,
+                "dropped_frames": data["dropped_frames"],
+                "snapshots": data["snapshot_stats"],
+                "clips": data["clip_stats"],
+                "recognition": data["recognition_stats"],
+                "appearances": data["appearances"],
+            },
+        )
+        self.event_store.finalize_session(data["session_id"])
+        self.event_store.flush()
+
+        # the text file is just a rendered view of what is in the event store
+        session_id = data["session_id"]
+        lines = summary_lines(self.event_store.session(session_id),
+                              self.event_store.label_counts(session_id))
+
+        with open(data["file_name"], "w") as f:
+            f.write("\n".join(lines))
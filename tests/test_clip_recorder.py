@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from clip_recorder import clip_path
+
+
+def test_clips_in_the_same_second_get_distinct_paths(tmp_path):
+    start = datetime(2026, 1, 1, 12, 0, 0, 250000)
+    first = clip_path(str(tmp_path), "Juliana", start)
+    open(first, "wb").close()
+    second = clip_path(str(tmp_path), "Juliana", start.replace(microsecond=900000))
+    open(second, "wb").close()
+    third = clip_path(str(tmp_path), "Juliana", start)
+    assert len({first, second, third}) == 3
+    assert second.endswith("_1.mp4") and third.endswith("_2.mp4")
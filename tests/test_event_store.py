@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+import pytest
+
+from event_store import _parse_legacy_summary
+
+SESSION_ID = "2026-01-01_08-00-00"
+
+
+@pytest.mark.parametrize("duration", [
+    timedelta(minutes=5, seconds=7),
+    timedelta(hours=23, minutes=59, seconds=59),
+    timedelta(days=1, hours=2, minutes=3, seconds=4),
+    timedelta(days=3, seconds=10),
+])
+def test_legacy_summary_duration(tmp_path, duration):
+    path = tmp_path / f"session_{SESSION_ID}.txt"
+    path.write_text(
+        "Date: January 01, 2026\n"
+        f"Session Duration: {duration}\n"
+        "Detected Faces:\n"
+        "  - Juliana (4)\n"
+        "  - Unknown (2)\n"
+    )
+    fields, counts = _parse_legacy_summary(str(path), SESSION_ID)
+    assert fields["duration_s"] == duration.total_seconds()
+    assert counts == {"Juliana": 4, "Unknown": 2}
+    assert fields["target_faces"] == 4
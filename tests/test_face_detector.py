@@ -0,0 +1,33 @@
+import random
+
+from face_detector import _merge_rois, box_iou
+
+
+def overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def test_merge_is_transitive():
+    # a and c only meet through b, which sorts after both
+    a, c, b = (0, 0, 10, 10), (5, 20, 15, 30), (6, 5, 12, 25)
+    far = (100, 100, 120, 120)
+    assert sorted(_merge_rois([b, far, c, a])) == [(0, 0, 15, 30), far]
+
+
+def test_merged_rois_never_overlap_and_cover_the_input():
+    rng = random.Random(0)
+    for _ in range(200):
+        rois = []
+        for _ in range(rng.randint(1, 12)):
+            x, y = rng.randint(0, 200), rng.randint(0, 200)
+            rois.append((x, y, x + rng.randint(1, 60), y + rng.randint(1, 60)))
+        merged = _merge_rois(rois)
+        for i, m in enumerate(merged):
+            assert not any(overlaps(m, other) for other in merged[i + 1:])
+        for r in rois:
+            assert any(m[0] <= r[0] and m[1] <= r[1] and r[2] <= m[2] and r[3] <= m[3] for m in merged)
+
+
+def test_box_iou():
+    assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert box_iou((0, 0, 10, 10), (20, 20, 5, 5)) == 0.0
@@ -0,0 +1,38 @@
+import numpy as np
+
+from face_gallery import FaceGallery, _match_crops, face_vectors
+
+
+def pattern(seed, size=64):
+    return (np.random.default_rng(seed).random((size, size)) * 255).astype(np.uint8)
+
+
+def test_face_vectors_are_unit_norm_and_zero_mean():
+    vecs = face_vectors([pattern(1), pattern(2, size=90)])
+    assert vecs.shape == (2, 1024)
+    np.testing.assert_allclose(np.linalg.norm(vecs, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_allclose(vecs.mean(axis=1), 0.0, atol=1e-6)
+
+
+def test_match_scores_each_identity_by_its_best_template():
+    gallery = FaceGallery([("Bob", pattern(3)), ("Alice", pattern(1)), ("Alice", pattern(2))])
+    labels, scores = gallery.match(face_vectors([pattern(2), pattern(3)]), top_k=2)
+    assert labels[:, 0].tolist() == ["Alice", "Bob"]
+    np.testing.assert_allclose(scores[:, 0], 1.0, rtol=1e-5)
+    assert labels[0, 1] == "Bob" and scores[0, 1] < scores[0, 0]
+
+
+def test_match_crops_applies_the_threshold():
+    gray = np.zeros((100, 200), np.uint8)
+    gray[:64, :64] = pattern(1)
+    gray[:64, 100:164] = pattern(7)
+    gallery = FaceGallery([("Alice", pattern(1))])
+    labels, scores = _match_crops(gray, [(0, 0, 64, 64), (100, 0, 64, 64)], gallery, threshold=0.6)
+    assert labels == ["Alice", "Unknown"]
+    assert scores[0] > 0.99 and scores[1] < 0.6
+
+
+def test_empty_gallery_labels_everything_unknown():
+    gray = pattern(1)
+    labels, scores = _match_crops(gray, [(0, 0, 32, 32)], FaceGallery([]), threshold=0.6)
+    assert labels == ["Unknown"] and scores == [0.0]
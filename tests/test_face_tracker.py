@@ -0,0 +1,33 @@
+import numpy as np
+
+from face_tracker import FaceTracker
+
+
+def textured_frame(offset=0):
+    rng = np.random.default_rng(0)
+    gray = np.full((240, 320), 128, np.uint8)
+    gray[60:140, 40 + offset:120 + offset] = rng.integers(0, 255, (80, 80), dtype=np.uint8)
+    return gray
+
+
+def test_textureless_face_is_kept_between_detections():
+    gray = textured_frame()
+    gray[60:140, 200:280] = 90  # flat patch: no corners to seed
+    tracker = FaceTracker(detect_every_n=5)
+    detections = [(40, 60, 80, 80, "Juliana", 0.9), (200, 60, 80, 80, "Unknown", 0.2)]
+    tracker.reset(gray, detections)
+
+    moved = textured_frame(offset=3)
+    moved[60:140, 200:280] = 90
+    tracked = tracker.update(moved)
+    labels = [d[4] for d in tracked]
+    assert labels == ["Juliana", "Unknown"]
+    assert tracked[1][:4] == (200, 60, 80, 80)
+    assert abs(tracked[0][0] - 43) <= 1
+
+
+def test_only_static_boxes():
+    gray = np.full((240, 320), 100, np.uint8)
+    tracker = FaceTracker()
+    tracker.reset(gray, [(10, 10, 50, 50, "Unknown", 0.1)])
+    assert tracker.update(gray) == [(10, 10, 50, 50, "Unknown", 0.1)]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from flight_sim import FlightProfile, format_duration
+
+
+def test_straight_leg_is_trapezoidal():
+    # 200 m at 10 m/s with 2 m/s^2: 5 s up, 15 s cruise, 5 s down
+    trajectory = FlightProfile(10, 2, 90, 1).plan([(0, 0), (200, 0)])
+    assert trajectory.duration == pytest.approx(25.0)
+    assert trajectory.etas() == pytest.approx([25.0])
+
+
+def test_short_leg_never_reaches_cruise():
+    trajectory = FlightProfile(10, 2, 90, 1).plan([(0, 0), (10, 0)])
+    assert trajectory.duration == pytest.approx(2 * np.sqrt(5.0))
+
+
+def test_samples_respect_speed_and_acceleration_limits():
+    trajectory = FlightProfile(10, 2, 90, 2).plan([(0, 0), (400, 0), (400, 400), (0, 400), (0, 30)])
+    t = np.linspace(0, trajectory.duration, 4000)
+    xy, _, speed = trajectory.sample(t)
+    moved = np.hypot(*np.diff(xy, axis=0).T) / 2 / np.diff(t)
+    assert moved.max() <= 10 + 1e-6
+    assert np.abs(np.diff(speed) / np.diff(t)).max() <= 2 + 1e-6
+    np.testing.assert_allclose(xy[0], (0, 0))
+    np.testing.assert_allclose(xy[-1], (0, 30), atol=1e-6)
+    assert speed[0] == pytest.approx(0) and speed[-1] == pytest.approx(0, abs=1e-6)
+
+
+def test_hairpin_slows_to_a_stop():
+    trajectory = FlightProfile(10, 2, 90, 1).plan([(0, 0), (100, 0), (0, 0)])
+    assert trajectory.exit[0] == pytest.approx(0, abs=1e-3)
+
+
+def test_degenerate_routes():
+    profile = FlightProfile()
+    assert profile.plan([(5, 5)]) is None
+    assert profile.plan([(5, 5), (5, 5)]) is None
+    with pytest.raises(ValueError):
+        FlightProfile(cruise_speed=0)
+
+
+def test_format_duration():
+    assert format_duration(42) == "42s"
+    assert format_duration(125) == "2m 05s"
+    assert format_duration(3725) == "1h 02m 05s"
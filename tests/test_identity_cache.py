@@ -0,0 +1,32 @@
+from identity_cache import LABEL_CONFIRMATIONS, IdentityCache
+
+BOX = (100, 100, 80, 80)
+
+
+def test_flicker_around_threshold_counts_one_appearance():
+    cache = IdentityCache(threshold=0.5, uncertain_margin=0.05)
+    track = cache.associate([BOX])[0]
+    cache.store(track, "Juliana", 0.9, now=0)
+    for i in range(20):
+        label, score = ("Unknown", 0.48) if i % 2 else ("Juliana", 0.52)
+        cache.store(track, label, score, now=i + 1)
+    assert cache.pop_appearances() == ["Juliana"]
+
+
+def test_uncertain_first_label_waits_for_confirmation():
+    cache = IdentityCache(threshold=0.5, uncertain_margin=0.05)
+    track = cache.associate([BOX])[0]
+    for i in range(LABEL_CONFIRMATIONS - 1):
+        cache.store(track, "Juliana", 0.52, now=i)
+    assert cache.pop_appearances() == []
+    cache.store(track, "Juliana", 0.52, now=10)
+    assert cache.pop_appearances() == ["Juliana"]
+
+
+def test_lasting_label_change_counts_again():
+    cache = IdentityCache(threshold=0.5, uncertain_margin=0.05)
+    track = cache.associate([BOX])[0]
+    cache.store(track, "Unknown", 0.1, now=0)
+    for i in range(LABEL_CONFIRMATIONS):
+        cache.store(track, "Juliana", 0.9, now=i + 1)
+    assert cache.pop_appearances() == ["Unknown", "Juliana"]
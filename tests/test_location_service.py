@@ -0,0 +1,28 @@
+import pytest
+
+from location_service import (FixedLocationBackend, IPLocationBackend, NMEAReplayBackend,
+                              make_location_backend, parse_nmea_line)
+
+
+@pytest.mark.parametrize("settings", [
+    {"location_backend": "fixed", "location_fixed": None},
+    {"location_backend": "fixed", "location_fixed": [1.0]},
+    {"location_backend": "fixed", "location_fixed": ["north", "east"]},
+    {"location_backend": "nmea", "location_nmea_file": ""},
+    {"location_backend": "nmea", "location_nmea_file": "no/such/file.nmea"},
+    {"location_backend": "satellite"},
+])
+def test_bad_settings_fall_back_to_ip(settings):
+    assert isinstance(make_location_backend(settings), IPLocationBackend)
+
+
+def test_valid_settings(tmp_path):
+    fixed = make_location_backend({"location_backend": "fixed", "location_fixed": [52.5, "13.4"]})
+    assert isinstance(fixed, FixedLocationBackend)
+    assert fixed.fetch() == [52.5, 13.4]
+
+    log = tmp_path / "track.nmea"
+    log.write_text("$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47\n")
+    nmea = make_location_backend({"location_backend": "nmea", "location_nmea_file": str(log)})
+    assert isinstance(nmea, NMEAReplayBackend)
+    assert nmea.fetch() == parse_nmea_line(log.read_text())
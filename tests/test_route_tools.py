@@ -0,0 +1,119 @@
+import random
+
+import numpy as np
+
+import pytest
+
+from route_tools import coverage_path, optimize_route, path_length, simplify_route
+
+
+def serpentine(rows, cols, step=10):
+    points = []
+    for r in range(rows):
+        xs = range(cols) if r % 2 == 0 else reversed(range(cols))
+        points.extend((x * step, r * step) for x in xs)
+    return points
+
+
+def test_optimal_serpentine_is_not_made_longer():
+    points = serpentine(10, 10)
+    assert path_length(points) == pytest.approx(990)
+    assert path_length(optimize_route(points)) <= path_length(points)
+
+
+@pytest.mark.parametrize("closed", [False, True])
+@pytest.mark.parametrize("seed", range(20))
+def test_never_longer_than_input(seed, closed):
+    rng = random.Random(seed)
+    points = [(rng.uniform(0, 800), rng.uniform(0, 600)) for _ in range(rng.randint(3, 60))]
+    once = optimize_route(points, closed=closed)
+    twice = optimize_route(once, closed=closed)
+    assert path_length(once, closed) <= path_length(points, closed) + 1e-9
+    assert path_length(twice, closed) <= path_length(once, closed) + 1e-9
+
+
+def test_keeps_start_and_every_waypoint():
+    rng = random.Random(1)
+    points = [(rng.uniform(0, 500), rng.uniform(0, 500)) for _ in range(40)]
+    result = optimize_route(points, fix_start=True)
+    assert result[0] == points[0]
+    assert sorted(result) == sorted(points)
+
+
+def test_coverage_of_a_square_has_one_leg_per_track():
+    square = [(0, 0), (100, 0), (100, 100), (0, 100)]
+    points = coverage_path(square, spacing=20, angle=0)
+    assert len(points) == 2 * 5
+    assert sorted({round(y) for _, y in points}) == [10, 30, 50, 70, 90]
+    assert all(-1e-6 <= x <= 100 + 1e-6 for x, _ in points)
+
+
+def test_coverage_of_an_area_narrower_than_the_spacing_is_empty():
+    assert coverage_path([(0, 0), (100, 0), (100, 5), (0, 5)], [], 20, 0) == []
+
+
+def test_simplify_collapses_a_nearly_straight_line_to_its_endpoints():
+    points = [(x, 1.5 if x % 20 == 10 else 0.0) for x in range(0, 201, 10)]
+    assert simplify_route(points, tolerance=2.0) == [points[0], points[-1]]
+
+
+def test_simplify_tolerance_boundary():
+    # the middle point sits exactly 3 px off the chord: kept only above the tolerance
+    points = [(0, 0), (50, 3), (100, 0)]
+    assert simplify_route(points, tolerance=3.0) == [(0, 0), (100, 0)]
+    assert simplify_route(points, tolerance=2.999) == points
+
+
+def densified_square(size=100, step=5, noise=0.5):
+    corners = [(0, 0), (size, 0), (size, size), (0, size)]
+    points = []
+    for (x1, y1), (x2, y2) in zip(corners, corners[1:] + corners[:1]):
+        for i in range(size // step):
+            t = i / (size // step)
+            wobble = noise if i % 2 else -noise
+            dx, dy = (0, wobble) if y1 == y2 else (wobble, 0)
+            points.append((x1 + t * (x2 - x1) + (dx if i else 0), y1 + t * (y2 - y1) + (dy if i else 0)))
+    return corners, points
+
+
+def test_simplify_closed_loop_keeps_its_corners():
+    corners, points = densified_square()
+    simplified = simplify_route(points, tolerance=2.0, closed=True)
+    assert simplified[0] == points[0]
+    assert sorted(simplified) == sorted(corners)
+    assert path_length(simplified, closed=True) == pytest.approx(400)
+
+
+def test_simplify_identical_points():
+    points = [(7, 7)] * 5
+    assert simplify_route(points, tolerance=1.0, closed=True) == [(7, 7)]
+    assert simplify_route(points, tolerance=1.0) == [(7, 7), (7, 7)]
+
+
+def inside(point, ring):
+    """Even-odd point-in-polygon test."""
+    x, y = point
+    result = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            result = not result
+    return result
+
+
+# a U shape (concave) with a square hole in its left arm
+U_SHAPE = [(0, 0), (300, 0), (300, 300), (200, 300), (200, 100), (100, 100), (100, 300), (0, 300)]
+HOLE = [(30, 150), (70, 150), (70, 250), (30, 250)]
+
+
+@pytest.mark.parametrize("angle", [0, 30, 90, None])
+def test_coverage_legs_stay_inside_the_outline_and_out_of_holes(angle):
+    points = coverage_path(U_SHAPE, [HOLE], spacing=15, angle=angle)
+    assert len(points) >= 2 and len(points) % 2 == 0
+    for a, b in zip(points[0::2], points[1::2]):
+        for t in np.linspace(0.02, 0.98, 25):
+            p = (a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1]))
+            assert inside(p, U_SHAPE), (angle, a, b)
+            assert not inside(p, HOLE), (angle, a, b)
+    # both arms and the base are swept, including around the hole
+    assert any(x > 200 for x, _ in points) and any(x < 100 for x, _ in points)
+    assert any(inside(p, [(0, 150), (100, 150), (100, 300), (0, 300)]) for p in points)
@@ -0,0 +1,118 @@
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+
+from snapshot_dedup import SnapshotDeduper, dhash, hamming
+from snapshot_writer import SnapshotWriter
+
+BOX = (300, 200, 100, 100)
+
+
+def face(seed):
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur((rng.random((100, 100, 3)) * 255).astype(np.uint8), (15, 15), 5)
+
+
+def frame_with(crop):
+    frame = np.zeros((480, 640, 3), np.uint8)
+    x, y, w, h = BOX
+    frame[y:y + h, x:x + w] = crop
+    return frame
+
+
+def wait_idle(writer, timeout=5.0):
+    """Snapshots are seconds apart in the app; let each write land before the next submit."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = writer.stats()
+        if stats["written"] + stats["failed"] >= stats["submitted"]:
+            return
+        time.sleep(0.01)
+
+
+def jitter(crop, seed):
+    noise = np.random.default_rng(seed).integers(-4, 5, crop.shape)
+    return np.clip(crop.astype(int) + noise, 0, 255).astype(np.uint8)
+
+
+def test_dhash_tolerates_noise_but_not_a_different_face():
+    assert hamming(dhash(face(1)), dhash(jitter(face(1), 2))) <= 6
+    assert hamming(dhash(face(1)), dhash(face(3))) > 6
+
+
+def test_deduper_matches_within_threshold_and_forgets_old_hashes():
+    rng = random.Random(0)
+    hashes = [rng.getrandbits(64) for _ in range(10)]
+    dedup = SnapshotDeduper(threshold=6, recent=4)
+    for i, value in enumerate(hashes):
+        dedup.add("Unknown", [value], f"p{i}")
+    assert dedup.match("Unknown", [hashes[9] ^ 0b100101001]) == "p9"
+    assert dedup.match("Unknown", [hashes[9] ^ 0b1111111]) is None
+    assert dedup.match("Unknown", [hashes[1]]) is None     # evicted
+    assert dedup.match("Juliana", [hashes[9]]) is None     # other label
+    assert dedup.match("Unknown", []) is None
+    assert dedup.match("Unknown", [hashes[9], None]) is None
+
+
+def test_writer_skips_near_duplicates_and_returns_the_original_path(tmp_path):
+    folder = str(tmp_path)
+    writer = SnapshotWriter(dedup=SnapshotDeduper())
+    start = datetime(2026, 1, 1)
+    crops = [face(1), jitter(face(1), 2), jitter(face(1), 3), face(4)]
+    returned = []
+    for i, crop in enumerate(crops):
+        returned.append(writer.submit(frame_with(crop), [("Unknown", folder)], start + timedelta(seconds=3 * i),
+                                      (0, 0), [BOX]))
+        wait_idle(writer)
+    writer.close()
+
+    first, other = returned[0][0], returned[3][0]
+    assert returned[1] == [first] and returned[2] == [first]
+    assert other != first
+    assert sorted(f for f in os.listdir(folder) if f.endswith(".jpg")) == sorted(
+        os.path.basename(p) for p in (first, other))
+    stats = writer.stats()
+    assert stats["written"] == 2
+    assert stats["deduplicated"] == 2
+    assert stats["bytes_saved"] > 0
+
+
+def test_writer_without_boxes_writes_everything(tmp_path):
+    writer = SnapshotWriter(dedup=SnapshotDeduper())
+    start = datetime(2026, 1, 1)
+    for i in range(3):
+        writer.submit(frame_with(face(1)), [("Unknown", str(tmp_path))], start + timedelta(seconds=3 * i), (0, 0))
+    writer.close()
+    assert writer.stats()["written"] == 3
+
+
+def test_failed_write_is_not_used_as_an_original(tmp_path):
+    missing = str(tmp_path / "not_created_yet")
+    writer = SnapshotWriter(dedup=SnapshotDeduper())
+    start = datetime(2026, 1, 1)
+    writer.submit(frame_with(face(1)), [("Unknown", missing)], start, (0, 0), [BOX])
+    writer.close()
+    assert writer.stats()["failed"] == 1
+
+    os.makedirs(missing)
+    writer2 = SnapshotWriter(dedup=writer.dedup)
+    paths = writer2.submit(frame_with(jitter(face(1), 2)), [("Unknown", missing)], start + timedelta(seconds=3),
+                           (0, 0), [BOX])
+    writer2.close()
+    assert os.path.exists(paths[0])
+    assert writer2.stats()["deduplicated"] == 0
+
+
+def test_a_crowded_snapshot_counts_once_towards_recent():
+    rng = random.Random(5)
+    dedup = SnapshotDeduper(threshold=6, recent=2)
+    first = rng.getrandbits(64)
+    dedup.add("Unknown", [first], "p0")
+    dedup.add("Unknown", [rng.getrandbits(64) for _ in range(5)], "crowd")
+    assert dedup.match("Unknown", [first]) == "p0"
+    dedup.add("Unknown", [rng.getrandbits(64)], "p2")
+    assert dedup.match("Unknown", [first]) is None
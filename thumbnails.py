@@ -0,0 +1,44 @@
+import os
+
+from PIL import Image
+
+THUMB_SIZE = (100, 100)
+THUMB_DIR = "thumbs"
+THUMB_JPEG_QUALITY = 80
+
+
+def thumbnail_path(image_path):
+    """session_snapshots/<id>/known/x.jpg -> session_snapshots/<id>/thumbs/known/x.jpg"""
+    label_dir, name = os.path.split(image_path)
+    session_dir, label = os.path.split(label_dir)
+    return os.path.join(session_dir, THUMB_DIR, label, name)
+
+
+def load_thumbnail(image_path):
+    """
+    Return a THUMB_SIZE PIL image for `image_path`, creating the sidecar on
+    first view for snapshots written before thumbnails existed.
+    """
+    path = thumbnail_path(image_path)
+    try:
+        if os.path.getmtime(path) >= os.path.getmtime(image_path):
+            with Image.open(path) as thumb:
+                return thumb.copy()
+    except OSError:
+        pass
+
+    with Image.open(image_path) as img:
+        img.draft("RGB", THUMB_SIZE)  # let the JPEG decoder skip full-resolution work
+        thumb = img.convert("RGB").resize(THUMB_SIZE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    thumb.save(path, "JPEG", quality=THUMB_JPEG_QUALITY)
+    return thumb
+
+
+def list_snapshots(dir_path):
+    """Snapshot file paths in `dir_path`, sorted by name, without stat'ing every file."""
+    if not os.path.isdir(dir_path):
+        return []
+    with os.scandir(dir_path) as it:
+        names = sorted(e.name for e in it if e.is_file() and e.name.lower().endswith((".jpg", ".jpeg", ".png")))
+    return [os.path.join(dir_path, n) for n in names]